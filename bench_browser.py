@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Benchmark the generated page in a headless browser for several library sizes.
+
+Requirements:
+    pip install numpy scipy matplotlib Pillow soundfile   (same as build_crowtalk.py)
+    pip install playwright && playwright install chromium
+
+Usage:
+    python3 bench_browser.py                                 # libraries of 10 and 100 recordings
+    python3 bench_browser.py --sizes 100 2000 --loads 5
+    python3 bench_browser.py --sizes 2000 --compare old.json
+
+For each size a page is built from a synthetic corpus (bench_build.py; the
+corpus and its build cache are kept in .cache/bench/, so only the first run
+of a size pays for the build) and served from localhost. Each load opens it
+in a fresh browser context with #perf and measures:
+    load        DOMContentLoaded / load event (navigation timing)
+    rec_parse   the inline RECORDINGS literal: JSON.parse and as JS
+    init        init() as recorded by the perf overlay
+    render      renderSoundList() with all items, including layout
+    blob_url    getBlobUrl() for an item not decoded yet
+    first_play  openPlayer() + play until playback has started
+    idb         dbAdd() per record and dbGetAll() for --idb-records records
+    heap        JS heap after init and after the run (MB, after GC)
+Results go to bench_browser_results.json (median/min/max over the loads).
+"""
+
+import sys, os, json, time, argparse, platform, threading, functools
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+sys.stdout.reconfigure(encoding='utf-8')
+
+import bench_build as bb
+
+try:
+    from playwright.sync_api import sync_playwright
+except ImportError:
+    sync_playwright = None
+
+OUT_FILE     = os.path.join(bb.bc._HERE, 'bench_browser_results.json')
+BENCH_FORMAT = 1
+
+# Runs in the page after load; top-level declarations of the app script are in scope.
+PROBE = """async ({renders, idbRecords}) => {
+  const out = {}, now = () => performance.now();
+  const until = async (ok, ms) => {
+    const t = now();
+    while (!ok()) { if (now() - t > ms) return false; await new Promise(r => setTimeout(r, 5)); }
+    return true;
+  };
+  const list = document.getElementById('soundList');
+  await until(() => perfSpans.init?.length, 60000);
+  const nav = performance.getEntriesByType('navigation')[0];
+  out.dom_content_loaded = nav.domContentLoadedEventEnd;
+  out.load = nav.loadEventEnd;
+  out.init = perfSpans.init?.[0] ?? null;
+
+  const src = [...document.scripts].map(s => s.textContent).find(s => s.includes('const RECORDINGS = '));
+  const a = src.indexOf('const RECORDINGS = ') + 19, lit = src.slice(a, src.indexOf(';\\n', a));
+  let t = now(); JSON.parse(lit); out.rec_parse_json = now() - t;
+  t = now(); (new Function('return ' + lit))(); out.rec_parse_js = now() - t;
+
+  const r = [];
+  for (let i = 0; i < renders; i++) { t = now(); renderSoundList(); list.offsetHeight; r.push(now() - t); }
+  out.render = r.sort((x, y) => x - y)[r.length >> 1];
+
+  const real = filteredItems.map((it, i) => it.type === 'real' ? i : -1).filter(i => i >= 0);
+  const fresh = real.filter(i => !blobUrlCache[filteredItems[i].id]);
+  if (fresh.length) { t = now(); getBlobUrl(filteredItems[fresh[fresh.length - 1]]); out.blob_url = now() - t; }
+  if (fresh.length > 1) {
+    const idx = fresh[fresh.length >> 1];
+    t = now();
+    openPlayer(idx);
+    handleBigPlayClick();
+    out.first_play = await until(() => playerPlaying(), 10000) ? now() - t : null;
+    stopMain();
+  }
+
+  try {
+    const blob = new Blob([new Uint8Array(32768)], {type: 'audio/webm'});
+    t = now();
+    for (let i = 0; i < idbRecords; i++) await dbAdd('recordings', {blob, category: '', ts: Date.now(), duration: 1});
+    out.idb_add = (now() - t) / idbRecords;
+    t = now(); await dbGetAll('recordings'); out.idb_get_all = now() - t;
+  } catch (e) { out.idb_add = out.idb_get_all = null; }
+  out.items = filteredItems.length;
+  return out;
+}"""
+
+def serve(root):
+    """Serve `root` on a free localhost port; returns the server (shut down by the caller)."""
+    class Quiet(SimpleHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(Quiet, directory=root))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+def heap_mb(cdp):
+    cdp.send('HeapProfiler.collectGarbage')
+    m = {x['name']: x['value'] for x in cdp.send('Performance.getMetrics')['metrics']}
+    return round(m['JSHeapUsedSize'] / 1048576, 2)
+
+def load_once(browser, url, opt):
+    ctx = browser.new_context()
+    try:
+        page = ctx.new_page()
+        page.on('pageerror', lambda e: print(f"\n  ⚠ {e}"))
+        cdp = ctx.new_cdp_session(page)
+        cdp.send('Performance.enable')
+        page.goto(url + '#perf', wait_until='load', timeout=600000)
+        page.wait_for_function('() => perfSpans.init?.length', timeout=600000)
+        m = {'heap_init': heap_mb(cdp)}
+        m.update(page.evaluate(PROBE, {'renders': opt.renders, 'idbRecords': opt.idb_records}))
+        m['heap_end'] = heap_mb(cdp)
+        return m
+    finally:
+        ctx.close()
+
+def summary(values):
+    v = sorted(x for x in values if x is not None)
+    if not v:
+        return None
+    return {'p50': round(v[len(v) // 2], 3), 'min': round(v[0], 3), 'max': round(v[-1], 3)}
+
+def bench_size(browser, n, opt):
+    root, spec = bb.make_corpus(n, opt)
+    print(f"  {n} inspelningar: build...", end='', flush=True)
+    bb.timed_build(root)
+    httpd = serve(root)
+    try:
+        url = f"http://127.0.0.1:{httpd.server_address[1]}/index.html"
+        loads = []
+        for i in range(opt.loads):
+            print(f" {i + 1}", end='', flush=True)
+            loads.append(load_once(browser, url, opt))
+    finally:
+        httpd.shutdown()
+    metrics = {k: summary([l.get(k) for l in loads]) for k in sorted(set().union(*loads))}
+    print(f"  init {metrics['init']['p50'] if metrics['init'] else '–'} ms, render {metrics['render']['p50']} ms,"
+          f" heap {metrics['heap_end']['p50']} MB")
+    return {'corpus': spec, 'page_bytes': os.path.getsize(os.path.join(root, 'index.html')), 'loads': opt.loads,
+            'metrics': metrics}
+
+def compare(old, new):
+    """Print the change in median per metric for sizes present in both result files."""
+    prev = {r['corpus']['files']: r for r in old['runs']}
+    print(f"\n📊 Jämfört med {old.get('git') or '?'} ({old.get('created', '?')})")
+    print(f"  {'inspl.':>6} {'':<20}{'före':>10}{'nu':>10}")
+    for run in new['runs']:
+        o = prev.get(run['corpus']['files'])
+        if not o or o['corpus'] != run['corpus']:
+            continue
+        for k, v in run['metrics'].items():
+            a, b = (o['metrics'].get(k) or {}).get('p50'), (v or {}).get('p50')
+            if a is None or b is None or k == 'items':
+                continue
+            print(f"  {run['corpus']['files']:>6} {k:<20}{a:>10.2f}{b:>10.2f}{(b - a) / a if a else 0:>+7.0%}")
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    ap.add_argument('--sizes', type=int, nargs='+', default=[10, 100], help='recordings per page (1–5000)')
+    ap.add_argument('--rates', type=int, nargs='+', default=[22050, 44100])
+    ap.add_argument('--channels', type=int, nargs='+', default=[1, 2], choices=[1, 2])
+    ap.add_argument('--formats', nargs='+', default=['mp3'], choices=['wav', 'mp3'])
+    ap.add_argument('--seconds', type=float, nargs=2, default=[1, 4], metavar=('MIN', 'MAX'), help='duration range per file')
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--loads', type=int, default=3, help='page loads per size, each in a fresh context')
+    ap.add_argument('--renders', type=int, default=5)
+    ap.add_argument('--idb-records', type=int, default=100)
+    ap.add_argument('--jobs', type=int, default=os.cpu_count())
+    ap.add_argument('--headed', action='store_true', help='show the browser window')
+    ap.add_argument('--browser', metavar='PATH', help='Chrome/Chromium executable instead of the Playwright download')
+    ap.add_argument('--compare', metavar='OLD', help='earlier bench_browser_results.json to compare against')
+    ap.add_argument('--out', default=OUT_FILE)
+    opt = ap.parse_args()
+    if any(not 1 <= n <= 5000 for n in opt.sizes):
+        ap.error('--sizes must be between 1 and 5000')
+    if sync_playwright is None:
+        print("❌ Playwright saknas: pip install playwright && playwright install chromium")
+        sys.exit(1)
+
+    print("⏱  Benchmark av sidan i headless Chromium...")
+    with sync_playwright() as pw:
+        browser = pw.chromium.launch(headless=not opt.headed, executable_path=opt.browser,
+                                     args=['--autoplay-policy=no-user-gesture-required'])
+        try:
+            runs = [bench_size(browser, n, opt) for n in sorted(set(opt.sizes))]
+            version = browser.version
+        finally:
+            browser.close()
+    result = {
+        'format': BENCH_FORMAT, 'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'git': bb.git_rev(),
+        'browser': f"chromium {version}", 'python': platform.python_version(), 'platform': platform.platform(),
+        'params': {'loads': opt.loads, 'renders': opt.renders, 'idb_records': opt.idb_records},
+        'runs': runs,
+    }
+    with open(opt.out, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=1, sort_keys=True)
+    print(f"✅ {os.path.basename(opt.out)}")
+    if opt.compare:
+        with open(opt.compare, encoding='utf-8') as f:
+            compare(json.load(f), result)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Benchmark the build pipeline on synthetic crow-like audio corpora.
+
+Requirements:
+    pip install numpy scipy matplotlib Pillow soundfile   (same as build_crowtalk.py)
+
+Usage:
+    python3 bench_build.py                                  # corpora of 10 and 100 files
+    python3 bench_build.py --sizes 10 1000 5000 --jobs 8
+    python3 bench_build.py --rates 16000 96000 --channels 2 --formats wav
+    python3 bench_build.py --compare bench_old.json         # print changes against an earlier run
+
+Each corpus is generated offline (harmonic "kraa" calls with frequency glide,
+rasp and background noise; rates, channel counts and WAV/MP3 are mixed
+round-robin) and kept in .cache/bench/, so only the first run pays for it.
+Per corpus the full build runs cold (no cache), warm (from the disk cache, as a fresh process would: icons +
+HTML emission) and profiled (per-stage times, see build_crowtalk.py
+--profile); make_sono and base64 are also timed directly on a sample of
+files. The repo's ljud/, bidrag/, .cache/ and index.html are not touched.
+Results go to bench_results.json (sorted keys, one run per corpus).
+"""
+
+import sys, os, json, io, time, base64, hashlib, argparse, platform, subprocess, contextlib
+from concurrent.futures import ProcessPoolExecutor
+sys.stdout.reconfigure(encoding='utf-8')
+import numpy as np
+
+import build_crowtalk as bc
+
+BENCH_DIR   = os.path.join(bc.CACHE_DIR, 'bench')
+OUT_FILE    = os.path.join(bc._HERE, 'bench_results.json')
+BENCH_FORMAT = 1
+_CORPUS_VERSION = 1   # bump when synth_file() changes – regenerates cached corpora
+
+# --- Synthetic corpus -----------------------------------------------------------
+
+def synth_file(job):
+    """Write one synthetic recording: noise with a few harmonic calls, duration drawn from `seconds`."""
+    path, sr, channels, fmt, seconds, seed = job
+    rng = np.random.default_rng(seed)
+    dur = rng.uniform(*seconds)
+    x = rng.normal(0, 0.004, int(dur * sr))
+    t = rng.uniform(0.2, 0.6)
+    while t < dur - 0.5:
+        length = rng.uniform(0.15, 0.4)
+        f0 = rng.uniform(450, 750)
+        tt = np.arange(int(length * sr)) / sr
+        f = f0 * (1.15 - 0.3 * tt / length)                    # falling "kraa"
+        phase = 2 * np.pi * np.cumsum(f) / sr
+        call = sum(np.sin(k * phase) / k for k in range(1, 9) if k * f0 * 1.15 < sr / 2)
+        call *= np.sin(np.pi * tt / length) ** 0.5 * (1 + 0.4 * np.sin(2 * np.pi * rng.uniform(50, 90) * tt))  # envelope + rasp
+        i = int(t * sr)
+        x[i:i + len(call)] += 0.3 * call[:len(x) - i]
+        t += length + rng.uniform(0.2, 0.9)
+    x = x / np.abs(x).max() * 0.7
+    if channels == 2:
+        x = np.stack([x, 0.8 * np.roll(x, int(0.0007 * sr))], axis=1)   # second mic: later, quieter
+    import soundfile as sf
+    if fmt == 'mp3':
+        sf.write(path, x.astype(np.float32), sr, format='MP3')
+    else:
+        sf.write(path, x.astype(np.float32), sr, subtype='PCM_16')
+    return os.path.getsize(path)
+
+def corpus_jobs(n, rates, channels, formats, seconds, seed):
+    """Deterministic (path, sr, channels, fmt, seconds, seed) per file; parameters cycle independently."""
+    jobs = []
+    for i in range(n):
+        sr, ch, fmt = rates[i % len(rates)], channels[i // len(rates) % len(channels)], formats[i % len(formats)]
+        if fmt == 'mp3':
+            sr = min(sr, 48000)   # MPEG audio stops at 48 kHz
+        jobs.append((f"XC{9000000 + i} - Synthetic Crow {sr // 1000}k{'st' if ch == 2 else ''}.{fmt}", sr, ch, fmt, seconds, seed + i))
+    return jobs
+
+def make_corpus(n, opt):
+    """Return (directory, spec) of a cached corpus with n files, generating it if needed."""
+    spec = {'files': n, 'rates': opt.rates, 'channels': opt.channels, 'formats': opt.formats,
+            'seconds': opt.seconds, 'seed': opt.seed, 'version': _CORPUS_VERSION}
+    root = os.path.join(BENCH_DIR, hashlib.sha1(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:12])
+    audio = os.path.join(root, 'ljud')
+    if not os.path.exists(os.path.join(root, 'done')):
+        os.makedirs(audio, exist_ok=True)
+        jobs = [(os.path.join(audio, name), *rest) for name, *rest in corpus_jobs(n, opt.rates, opt.channels, opt.formats, opt.seconds, opt.seed)]
+        print(f"  genererar {n} filer → {os.path.relpath(root, bc._HERE)}")
+        with ProcessPoolExecutor(max_workers=opt.jobs) as pool:
+            spec['bytes'] = sum(pool.map(synth_file, jobs, chunksize=16))
+        with open(os.path.join(root, 'done'), 'w', encoding='utf-8') as f:
+            json.dump(spec, f)
+    with open(os.path.join(root, 'done'), encoding='utf-8') as f:
+        return root, json.load(f)
+
+# --- Timing -------------------------------------------------------------------------
+
+def stats(xs):
+    """mean / p50 / p95 / min in ms for a list of seconds."""
+    s = np.sort(np.asarray(xs)) * 1000
+    return {'n': len(s), 'mean': round(float(s.mean()), 3), 'p50': round(float(np.percentile(s, 50)), 3),
+            'p95': round(float(np.percentile(s, 95)), 3), 'min': round(float(s[0]), 3)}
+
+def timed_build(root, **kw):
+    """Run build_crowtalk.build() against a corpus directory; returns (wall s, cpu s)."""
+    bc.AUDIO_DIR, bc.CONTRIB_DIR = os.path.join(root, 'ljud'), os.path.join(root, 'bidrag')
+    bc.CACHE_DIR, bc.OUTPUT = os.path.join(root, '.cache'), os.path.join(root, 'index.html')
+    bc.CLASSIFIER_FILE = bc.DIALECT_FILE = os.path.join(root, 'absent.json')
+    w0, c0 = time.perf_counter(), time.process_time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        bc.build(**kw)
+    return time.perf_counter() - w0, time.process_time() - c0
+
+def micro(root, sample, repeat):
+    """make_sono and base64 timed directly (no tracemalloc) on up to `sample` files."""
+    names = sorted(os.listdir(os.path.join(root, 'ljud')))[:sample]
+    sono, b64, b64_bytes = [], [], 0
+    for name in names:
+        with open(os.path.join(root, 'ljud', name), 'rb') as f:
+            raw = f.read()
+        dec = bc.decode_audio(raw)
+        analysis = bc.to_analysis_rate(dec['data'], dec['sr'])
+        spec = bc.stft_power(analysis)
+        for _ in range(repeat):
+            t = time.perf_counter(); bc.make_sono(analysis, bc.ANALYSIS_SR, spec); sono.append(time.perf_counter() - t)
+            t = time.perf_counter(); base64.b64encode(raw).decode(); b64.append(time.perf_counter() - t)
+        b64_bytes += len(raw) * repeat
+    return {'make_sono': stats(sono), 'base64': {**stats(b64), 'mb_per_s': round(b64_bytes / 1048576 / sum(b64), 1)}}
+
+def bench_corpus(n, opt):
+    root, spec = make_corpus(n, opt)
+    import matplotlib.pyplot, scipy.signal   # import cost stays out of the first timing
+    print(f"  {n} filer: kall build...", end='', flush=True)
+    cold = timed_build(root, use_cache=False)
+    print(f" {cold[0]:.1f}s, varm...", end='', flush=True)
+    os.remove(bc.OUTPUT)   # otherwise the build stops at "nothing changed"
+    bc._memo.clear(); bc._fragments = {}   # warm means the disk cache, as in a fresh process
+    warm = timed_build(root)
+    run = {'corpus': spec,
+           'build': {'cold': {'wall': round(cold[0], 3), 'cpu': round(cold[1], 3)},
+                     'warm': {'wall': round(warm[0], 3), 'cpu': round(warm[1], 3)},
+                     'output_bytes': os.path.getsize(bc.OUTPUT)},
+           'micro': micro(root, opt.sample, opt.repeat)}
+    if not opt.no_stages:
+        print(" steg...", end='', flush=True)
+        prof = os.path.join(root, 'profile.json')
+        timed_build(root, use_cache=False, profile=prof)
+        with open(prof, encoding='utf-8') as f:
+            run['stages'] = {k: {'wall': v['wall'], 'cpu': v['cpu'], 'peak': v['peak']}
+                             for k, v in json.load(f)['stages'].items()}
+    print(f" warm {warm[0]:.2f}s, make_sono p50 {run['micro']['make_sono']['p50']:.0f} ms")
+    return run
+
+# --- Report ----------------------------------------------------------------------------
+
+def git_rev():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=bc._HERE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(old, new):
+    """Print relative changes for corpora present in both result files."""
+    def pct(a, b):
+        return f"{(b - a) / a:+.0%}" if a else 'n/a'
+    prev = {r['corpus']['files']: r for r in old['runs'] if r['corpus'].get('version') == _CORPUS_VERSION}
+    print(f"\n📊 Jämfört med {old.get('git') or '?'} ({old.get('created', '?')})")
+    print(f"  {'filer':>5} {'':<22}{'före':>10}{'nu':>10}")
+    for run in new['runs']:
+        o = prev.get(run['corpus']['files'])
+        if not o or o['corpus'] != run['corpus']:
+            continue
+        n = run['corpus']['files']
+        rows = [('build cold', o['build']['cold']['wall'], run['build']['cold']['wall']),
+                ('build warm', o['build']['warm']['wall'], run['build']['warm']['wall']),
+                ('make_sono p50', o['micro']['make_sono']['p50'], run['micro']['make_sono']['p50']),
+                ('base64 p50', o['micro']['base64']['p50'], run['micro']['base64']['p50'])]
+        rows += [(f"stage {k}", o['stages'][k]['wall'], v['wall'])
+                 for k, v in run.get('stages', {}).items() if k in o.get('stages', {})]
+        for label, a, b in rows:
+            print(f"  {n:>5} {label:<22}{a:>10.3f}{b:>10.3f}{pct(a, b):>7}")
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    ap.add_argument('--sizes', type=int, nargs='+', default=[10, 100], help='files per corpus (1–5000)')
+    ap.add_argument('--rates', type=int, nargs='+', default=[16000, 22050, 44100, 48000, 96000])
+    ap.add_argument('--channels', type=int, nargs='+', default=[1, 2], choices=[1, 2])
+    ap.add_argument('--formats', nargs='+', default=['wav', 'mp3'], choices=['wav', 'mp3'])
+    ap.add_argument('--seconds', type=float, nargs=2, default=[2, 8], metavar=('MIN', 'MAX'), help='duration range per file')
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--sample', type=int, default=20, help='files used for the make_sono/base64 timings')
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--no-stages', action='store_true', help='skip the profiled build (saves one cold build per corpus)')
+    ap.add_argument('--jobs', type=int, default=os.cpu_count())
+    ap.add_argument('--compare', metavar='OLD', help='earlier bench_results.json to compare against')
+    ap.add_argument('--out', default=OUT_FILE)
+    opt = ap.parse_args()
+    if any(not 1 <= n <= 5000 for n in opt.sizes):
+        ap.error('--sizes must be between 1 and 5000')
+
+    print("⏱  Benchmark av byggkedjan...")
+    runs = [bench_corpus(n, opt) for n in sorted(set(opt.sizes))]
+    result = {
+        'format': BENCH_FORMAT, 'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'git': git_rev(),
+        'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+        'params': {'sono_format': bc._SONO_FMT, 'sono_quality': bc.SONO_QUALITY, 'analysis_sr': bc.ANALYSIS_SR,
+                   'nfft': bc.FEAT_NFFT, 'hop': bc.FEAT_HOP},
+        'runs': runs,
+    }
+    with open(opt.out, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=1, sort_keys=True)
+    print(f"✅ {os.path.basename(opt.out)}")
+    if opt.compare:
+        with open(opt.compare, encoding='utf-8') as f:
+            compare(json.load(f), result)
+
+if __name__ == '__main__':
+    main()
@@ -3,137 +3,998 @@
 Build index.html – self-contained offline app with real crow audio,
 recording capability, field journal, alarm safety, and theory page.
 """
-import base64, os, json, io, warnings
+import base64, os, sys, json, io, csv, math, re, hashlib, zipfile, warnings, time, argparse, platform, unicodedata
+import shutil, subprocess, tempfile
+from contextlib import contextmanager
 warnings.filterwarnings('ignore')
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 from matplotlib.colors import LinearSegmentedColormap
-from scipy.signal import spectrogram as _sg
+# matplotlib.pyplot and scipy.signal are imported where used: together they are
+# most of the start-up time, and a fully cached build never needs them
+from scipy.fft import dct
+from PIL import Image, features   # ships with matplotlib
 
 # Dark app-themed colormap: silence → teal → green → amber peak
 _CROW_CMAP = LinearSegmentedColormap.from_list('crow', [
     '#07090a', '#0d2535', '#1a4a5a', '#2dd4bf', '#3ecf72', '#f0a832'])
 
-def make_sono(path):
-    """Generate a base64-encoded spectrogram PNG for an audio file."""
+# --- Build profiling (--profile) ------------------------------------------------
+# stage() times a step per input file: wall and CPU seconds, plus the peak memory
+# allocated during it (tracemalloc, numpy buffers included). Stages must not nest.
+_profile  = None   # {file: {stage: [wall, cpu, peak bytes]}} while profiling, else None
+_prof_cur = '(build)'
+
+@contextmanager
+def profiled(name):
+    """Attribute the stages inside the block to input file `name`."""
+    global _prof_cur
+    prev, _prof_cur = _prof_cur, name
+    try:
+        yield
+    finally:
+        _prof_cur = prev
+
+@contextmanager
+def stage(name):
+    if _profile is None:
+        yield
+        return
+    import tracemalloc
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    w0, c0 = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        wall, cpu = time.perf_counter() - w0, time.process_time() - c0
+        peak = tracemalloc.get_traced_memory()[1] - base
+        s = _profile.setdefault(_prof_cur, {}).setdefault(name, [0.0, 0.0, 0])
+        s[0] += wall; s[1] += cpu; s[2] = max(s[2], peak)
+
+# Silence trim / loudness normalisation (applied before the audio is embedded)
+TRIM_FRAME    = 0.02    # s – short-time energy frame
+TRIM_PAD      = 0.25    # s – context kept before the first and after the last call
+ONSET_DB      = 12      # dB above the noise floor that counts as call activity
+TARGET_RMS_DB = -20     # dBFS – RMS of the call frames after normalisation
+PEAK_LIMIT    = 0.98    # never push peaks above this
+
+FFMPEG = shutil.which('ffmpeg')   # optional: decodes the app's own webm/Opus and mp4/AAC exports
+
+def _ffmpeg_decode(src):
+    """Decode `src` with ffmpeg to mono float32 at 48 kHz. Returns (data, sr), or None without ffmpeg."""
+    if FFMPEG is None:
+        return None
+    if hasattr(src, 'seek'):
+        src.seek(0)
+        raw = src.read()
+    else:
+        with open(src, 'rb') as f:
+            raw = f.read()
+    with tempfile.TemporaryDirectory() as tmp:   # a file, not a pipe: mp4 may keep its index at the end
+        path = os.path.join(tmp, 'in')
+        with open(path, 'wb') as f:
+            f.write(raw)
+        p = subprocess.run([FFMPEG, '-v', 'error', '-i', path, '-ac', '1', '-ar', '48000', '-f', 'f32le', '-'],
+                           capture_output=True)
+    if p.returncode or not p.stdout:
+        return None
+    return np.frombuffer(p.stdout, np.float32).copy(), 48000
+
+def load_audio(src):
+    """Decode an audio file (path or file object) to mono float32. Returns (data, sr) or None."""
     try:
         import soundfile as sf
-        raw, sr = sf.read(path, always_2d=True)
+        raw, sr = sf.read(src, always_2d=True)
         data = raw.mean(axis=1).astype(np.float32)
     except Exception:
         try:
             from scipy.io import wavfile
-            sr, raw = wavfile.read(path)
+            if hasattr(src, 'seek'):
+                src.seek(0)
+            sr, raw = wavfile.read(src)
             if raw.ndim > 1:
                 raw = raw.mean(axis=1)
             data = raw.astype(np.float32)
             if data.max() > 1.0:
                 data = data / float(np.iinfo(raw.dtype).max)
         except Exception as e:
-            print(f"    ⚠ sono skip ({e})")
+            decoded = _ffmpeg_decode(src)
+            if decoded is None:
+                print(f"    ⚠ decode skip ({e})")
+            return decoded
+    return data, sr
+
+ANALYSIS_SR = 22050   # Hz – every analysis step (spectrogram, features) runs at this rate
+
+def to_analysis_rate(data, sr):
+    """Anti-aliased polyphase resampling to ANALYSIS_SR (no-op if already there)."""
+    if sr == ANALYSIS_SR or not len(data):
+        return data
+    from scipy.signal import resample_poly
+    g = math.gcd(ANALYSIS_SR, int(sr))
+    return resample_poly(data, ANALYSIS_SR // g, int(sr) // g).astype(np.float32)
+
+def audio_stats(data, sr):
+    """Duration (s), peak and RMS (linear, full scale = 1) of mono audio."""
+    if not len(data):
+        return {'dur': 0.0, 'peak': 0.0, 'rms': 0.0}
+    return {'dur': round(len(data) / sr, 2),
+            'peak': round(float(np.abs(data).max()), 3),
+            'rms': round(float(np.sqrt(np.mean(np.square(data)))), 4)}
+
+def decode_audio(raw):
+    """
+    The single decode step per file: raw bytes → {'data', 'sr', 'dur', 'peak', 'rms'}.
+    Everything downstream (trim, spectrogram, metadata) works from this. None if undecodable.
+    """
+    decoded = load_audio(io.BytesIO(raw))
+    if decoded is None:
+        return None
+    data, sr = decoded
+    return {'data': data, 'sr': sr, **audio_stats(data, sr)}
+
+def call_activity(data, sr, frame=TRIM_FRAME):
+    """Per-frame mask of short-time energy more than ONSET_DB above the noise floor. Returns (mask, hop)."""
+    hop = max(1, int(sr * frame))
+    n = len(data) // hop
+    if n == 0:
+        return np.zeros(0, bool), hop
+    energy = np.square(data[:n * hop].reshape(n, hop)).mean(axis=1)
+    db = 10 * np.log10(np.maximum(energy, 1e-12))
+    return db > np.percentile(db, 10) + ONSET_DB, hop
+
+def trim_and_normalise(data, sr, pad=TRIM_PAD):
+    """
+    Cut the silent lead-in/tail around detected calls (keeping `pad` seconds)
+    and scale so the call frames sit at TARGET_RMS_DB. Returns (data, start_s, gain).
+    """
+    active, hop = call_activity(data, sr)
+    idx = np.flatnonzero(active)
+    if idx.size:
+        a = max(0, idx[0] * hop - int(pad * sr))
+        b = min(len(data), (idx[-1] + 1) * hop + int(pad * sr))
+        calls = data[idx[0] * hop:(idx[-1] + 1) * hop].reshape(-1, hop)[active[idx[0]:idx[-1] + 1]]
+    else:
+        a, b, calls = 0, len(data), data
+    rms = float(np.sqrt(np.mean(np.square(calls)))) if calls.size else 0.0
+    peak = float(np.abs(data[a:b]).max()) if b > a else 0.0
+    gain = 1.0
+    if rms > 0 and peak > 0:
+        gain = min(10 ** (TARGET_RMS_DB / 20) / rms, PEAK_LIMIT / peak)
+    return (data[a:b] * gain).astype(np.float32), a / sr, gain
+
+# Shared analysis STFT (spectrogram image, call segmentation, features), at ANALYSIS_SR
+FEAT_NFFT   = 512
+FEAT_HOP    = 128     # 3/4 overlap – fine enough for the spectrogram image and call onsets
+N_MELS      = 32
+N_MFCC      = 13      # c0 (loudness) is dropped from the descriptor
+CONTOUR_PTS = 8       # dominant-frequency contour resampled to this many points
+
+# Call segmentation
+SEG_OFF_DB   = 6      # offset (hysteresis) threshold: this many dB below the onset threshold
+SEG_FLUX_K   = 4      # flux onsets inside a call: median + K·MAD of the spectral flux
+SEG_MIN_CALL = 0.04   # s – shorter runs are dropped
+SEG_MIN_GAP  = 0.03   # s – shorter silences are bridged
+SEG_MIN_ICI  = 0.12   # s – a flux onset never splits closer than this to a boundary
+SEG_BOUT_GAP = 1.5    # s – a longer silence ends a bout; the call-count rule reads one bout
+
+def stft_power(data):
+    """Hann-windowed power spectrogram at ANALYSIS_SR. Returns (freqs, power[frames, bins])."""
+    if len(data) < FEAT_NFFT:
+        data = np.pad(data, (0, FEAT_NFFT - len(data)))
+    frames = np.lib.stride_tricks.sliding_window_view(data, FEAT_NFFT)[::FEAT_HOP]
+    spec = np.fft.rfft(frames * np.hanning(FEAT_NFFT).astype(np.float32), axis=1)
+    return np.fft.rfftfreq(FEAT_NFFT, 1 / ANALYSIS_SR), (spec.real ** 2 + spec.imag ** 2).astype(np.float32)
+
+def frame_times(n):
+    """Centre time (s) of each of `n` STFT frames."""
+    return (np.arange(n) * FEAT_HOP + FEAT_NFFT / 2) / ANALYSIS_SR
+
+def mel_filterbank(n_mels=N_MELS, fmax=8000):
+    """Triangular HTK-mel filterbank matrix [n_mels, FEAT_NFFT//2 + 1]."""
+    mel = lambda hz: 2595 * np.log10(1 + hz / 700)
+    hz = lambda m: 700 * (10 ** (m / 2595) - 1)
+    edges = hz(np.linspace(0, mel(fmax), n_mels + 2))
+    f = np.fft.rfftfreq(FEAT_NFFT, 1 / ANALYSIS_SR)
+    lo, mid, hi = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    return np.maximum(0, np.minimum((f - lo) / (mid - lo), (hi - f) / (hi - mid))).astype(np.float32)
+
+_MEL_FB = mel_filterbank()
+
+def _runs(mask):
+    """[start, end) index pairs of the True runs in a boolean array, shape [n, 2]."""
+    return np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))).reshape(-1, 2)
+
+def segment_calls(f, power):
+    """
+    Call onsets/offsets from the analysis STFT. Frame energy with hysteresis
+    (onset ONSET_DB above the noise floor, offset SEG_OFF_DB lower) finds the
+    calls; spectral-flux peaks split calls that run into each other.
+    Returns float array [n_calls, 2] of (onset_s, offset_s).
+    """
+    band = (f >= 300) & (f <= 8000)
+    p = power[:, band]
+    db = 10 * np.log10(np.maximum(p.sum(axis=1), 1e-12))
+    floor = np.percentile(db, 10)
+    high, low = db > floor + ONSET_DB, db > floor + ONSET_DB - SEG_OFF_DB
+    fps = ANALYSIS_SR / FEAT_HOP
+    min_call, min_gap, min_ici = (max(1, round(x * fps)) for x in (SEG_MIN_CALL, SEG_MIN_GAP, SEG_MIN_ICI))
+
+    # Bridge short gaps in the low mask, then keep the runs that reach the onset threshold
+    gaps = _runs(~low)
+    gaps = gaps[(gaps[:, 0] > 0) & (gaps[:, 1] < len(low)) & (gaps[:, 1] - gaps[:, 0] < min_gap)]
+    fill = np.zeros(len(low) + 1, int)
+    np.add.at(fill, gaps[:, 0], 1)
+    np.add.at(fill, gaps[:, 1], -1)
+    low |= np.cumsum(fill)[:-1] > 0
+    runs = _runs(low)
+    n_high = np.concatenate(([0], np.cumsum(high)))
+    runs = runs[n_high[runs[:, 1]] > n_high[runs[:, 0]]]
+    if not len(runs):
+        return np.zeros((0, 2))
+
+    # Log-compressed, noise-normalised spectral flux (half-wave rectified)
+    mag = np.sqrt(p)
+    lg = np.log1p(mag / (np.median(mag) + 1e-12))
+    flux = np.concatenate(([0.0], np.maximum(0, np.diff(lg, axis=0)).sum(axis=1)))
+    med = np.median(flux)
+    thr = med + SEG_FLUX_K * np.median(np.abs(flux - med))
+    peak = (flux > thr) & (flux >= np.roll(flux, 1)) & (flux > np.roll(flux, -1))
+
+    calls = []
+    for a, b in runs:
+        cut = a
+        for i in np.flatnonzero(peak[a:b]) + a:
+            if i - cut >= min_ici and b - i >= min_ici:
+                calls.append((cut, i))
+                cut = i
+        calls.append((cut, b))
+    calls = np.array([c for c in calls if c[1] - c[0] >= min_call], dtype=float).reshape(-1, 2)
+    t = frame_times(len(power))
+    return np.stack([t[calls[:, 0].astype(int)], t[calls[:, 1].astype(int) - 1]], axis=1) if len(calls) else calls
+
+def pack_calls(calls):
+    """Flat [on, off, on, off, …] list in centiseconds – the compact form shipped in the page."""
+    return np.round(np.asarray(calls) * 100).astype(int).ravel().tolist()
+
+def extract_features(f, power, calls):
+    """
+    Compact descriptor from the analysis STFT and its call segments: MFCC 1–12
+    means over call frames, call count, inter-call interval mean/std (s), and
+    the dominant frequency contour (kHz) over call frames.
+    """
+    t = frame_times(len(power))
+    active = np.zeros(len(power), bool)
+    for on, off in calls:
+        active |= (t >= on) & (t <= off)
+    if not active.any():
+        active[:] = True
+    mfcc = dct(np.log(power @ _MEL_FB.T + 1e-10), type=2, norm='ortho', axis=1)[:, 1:N_MFCC]
+    ici = np.diff(np.asarray(calls)[:, 0]) if len(calls) else np.zeros(0)
+    band = (f >= 300) & (f <= 8000)
+    dom = f[band][np.argmax(power[:, band], axis=1)][active] / 1000
+    contour = np.interp(np.linspace(0, len(dom) - 1, CONTOUR_PTS), np.arange(len(dom)), dom)
+    return np.concatenate([mfcc[active].mean(axis=0),
+                           [len(calls), ici.mean() if ici.size else 0.0, ici.std() if ici.size else 0.0],
+                           contour]).round(4).tolist()
+
+# On-device call classifier: input features shared by the offline trainer and
+# the page's worker (clsWorkerMain mirrors classifier_input step for step; bump
+# _FEAT_VERSION in train_classifier.py when it changes)
+CLS_DIM    = 2 * N_MELS + 4
+CLS_FORMAT = 1        # weight-file layout understood by load_classifier() and the page
+CLS_PARAMS = {'sr': ANALYSIS_SR, 'nfft': FEAT_NFFT, 'hop': FEAT_HOP, 'n_mels': N_MELS, 'fmax': 8000,
+              'onset_db': ONSET_DB, 'dim': CLS_DIM}
+
+def classifier_input(f, power):
+    """
+    CLS_DIM floats: log-mel mean (minus its band average, so recording gain
+    cancels) and std over active frames, then the number of activity runs,
+    inter-onset interval mean/std (s) and mean run length (s).
+    Activity is the plain energy rule (no hysteresis) so the page can match it cheaply.
+    """
+    band = (f >= 300) & (f <= 8000)
+    db = 10 * np.log10(np.maximum(power[:, band].sum(axis=1), 1e-12))
+    active = db > np.percentile(db, 10) + ONSET_DB
+    runs = _runs(active)
+    if not active.any():
+        active[:] = True
+    lm = np.log(power[active] @ _MEL_FB.T + 1e-10)
+    ici = np.diff(runs[:, 0]) * FEAT_HOP / ANALYSIS_SR
+    run_len = (runs[:, 1] - runs[:, 0]).mean() * FEAT_HOP / ANALYSIS_SR if len(runs) else 0.0
+    return np.concatenate([lm.mean(axis=0) - lm.mean(), lm.std(axis=0),
+                           [len(runs), ici.mean() if ici.size else 0.0, ici.std() if ici.size else 0.0, run_len]
+                           ]).astype(np.float32)
+
+def feature_table(recs):
+    """
+    Z-score each feature over the library, clip to ±4 σ and quantise to int8.
+    Returns {'dim', 'data': base64 Int8Array [len(recs) × dim]}; rows without features are zero.
+    """
+    dim = next((len(r['feat']) for r in recs if r.get('feat')), 0)
+    if not dim:
+        return {'dim': 0, 'data': ''}
+    X = np.zeros((len(recs), dim), np.float32)
+    valid = np.array([bool(r.get('feat')) for r in recs])
+    X[valid] = [r['feat'] for r in recs if r.get('feat')]
+    mu, sd = X[valid].mean(axis=0), X[valid].std(axis=0) + 1e-6
+    q = np.round(np.clip((X - mu) / sd, -4, 4) * (127 / 4)).astype(np.int8)
+    q[~valid] = 0
+    return {'dim': dim, 'data': base64.b64encode(q.tobytes()).decode()}
+
+def encode_audio(data, sr, mime):
+    """Encode mono float32 audio as WAV (16-bit) or MP3. Returns bytes, or None if no encoder is available."""
+    buf = io.BytesIO()
+    if mime == 'audio/wav':
+        from scipy.io import wavfile
+        wavfile.write(buf, sr, (np.clip(data, -1, 1) * 32767).astype(np.int16))
+        return buf.getvalue()
+    if mime == 'audio/mpeg':
+        try:
+            import soundfile as sf
+            sf.write(buf, data, sr, format='MP3')   # libsndfile >= 1.1
+            return buf.getvalue()
+        except Exception:
             return None
-
-    # Downsample to 22050 Hz max
-    if sr > 22050:
-        step = sr // 22050
-        data = data[::step]
-        sr = sr // step
-
-    nperseg = min(512, len(data) // 8)
-    f, t, Sxx = _sg(data, fs=sr, nperseg=nperseg, noverlap=nperseg*3//4, nfft=1024)
+    return None
+
+SONO_AXES = [0.07, 0.15, 0.92, 0.78]   # plot area (left, bottom, width, height); the page places call markers on it
+
+def make_sono(data, sr, spec=None):
+    """
+    Generate a base64-encoded spectrogram image for decoded mono audio.
+    `spec` is the (freqs, power) analysis STFT when the caller already has it.
+    The time axis spans exactly 0…duration, so the page can place markers by fraction.
+    Returns (SONO_FORMAT image, palette PNG fallback – None for PNG or without SONO_FALLBACK).
+    """
+    data = to_analysis_rate(data, sr)
+    f, power = spec if spec is not None else stft_power(data)
+    t = frame_times(len(power))
     mask = f <= 8000
-    Sxx_db = 10 * np.log10(np.maximum(Sxx[mask], 1e-10))
+    Sxx_db = 10 * np.log10(np.maximum(power[:, mask].T, 1e-10))
     vmin, vmax = np.percentile(Sxx_db, [5, 99])
 
-    fig = plt.figure(figsize=(5.5, 1.3))
-    fig.patch.set_facecolor('#07090a')
-    ax = fig.add_axes([0.07, 0.15, 0.92, 0.78])
-    ax.pcolormesh(t, f[mask] / 1000, Sxx_db, vmin=vmin, vmax=vmax,
-                  cmap=_CROW_CMAP, shading='gouraud')
-    ax.set_facecolor('#07090a')
-    ax.set_ylim(0, 8)
-    ax.set_ylabel('kHz', color='#556070', fontsize=7, labelpad=2)
-    ax.tick_params(colors='#556070', labelsize=6, length=2, width=0.5)
-    for sp in ax.spines.values():
-        sp.set_edgecolor('#2a3540')
-
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png', dpi=80, facecolor='#07090a', edgecolor='none')
-    plt.close(fig)
-    return base64.b64encode(buf.getvalue()).decode()
-
-_HERE     = os.path.dirname(os.path.abspath(__file__))
-AUDIO_DIR = os.path.join(_HERE, "ljud")
-OUTPUT    = os.path.join(_HERE, "index.html")
-MAX_SIZE  = 6 * 1024 * 1024
+    import matplotlib.pyplot as plt
+    with stage('render'):
+        fig = plt.figure(figsize=(5.5, 1.3))
+        fig.patch.set_facecolor('#07090a')
+        ax = fig.add_axes(SONO_AXES)
+        ax.pcolormesh(t, f[mask] / 1000, Sxx_db, vmin=vmin, vmax=vmax,
+                      cmap=_CROW_CMAP, shading='gouraud')
+        ax.set_facecolor('#07090a')
+        ax.set_xlim(0, max(len(data), FEAT_NFFT) / ANALYSIS_SR)
+        ax.set_ylim(0, 8)
+        ax.set_ylabel('kHz', color='#556070', fontsize=7, labelpad=2)
+        ax.tick_params(colors='#556070', labelsize=6, length=2, width=0.5)
+        for sp in ax.spines.values():
+            sp.set_edgecolor('#2a3540')
+
+        buf = io.BytesIO()
+        fig.savefig(buf, format='png', dpi=80, facecolor='#07090a', edgecolor='none')
+        plt.close(fig)
+    with stage('sono'):
+        png = optimise_png(buf.getvalue())
+        if _SONO_FMT == 'PNG':
+            return base64.b64encode(png).decode(), None
+        return (base64.b64encode(encode_sono(buf.getvalue())).decode(),
+                base64.b64encode(png).decode() if SONO_FALLBACK else None)
+
+_HERE       = os.path.dirname(os.path.abspath(__file__))
+AUDIO_DIR   = os.path.join(_HERE, "ljud")
+CONTRIB_DIR = os.path.join(_HERE, "bidrag")   # reviewed app export bundles (.json / .zip)
+CACHE_DIR   = os.path.join(_HERE, ".cache")
+META_INDEX  = "index.csv"                      # per-recording metadata in ljud/, *.json sidecars override
+OUTPUT      = os.path.join(_HERE, "index.html")
+MAX_SIZE    = 6 * 1024 * 1024
+CLASSIFIER_FILE = os.path.join(_HERE, "classifier.json")   # written by train_classifier.py, optional
+DIALECT_FILE    = os.path.join(_HERE, "dialect_grid.json")  # written by dialect_grid.py, optional
+DIALECT_FORMAT   = 1
+DIALECT_FEATURES = ('f0', 'len', 'ici', 'n')   # dominant kHz, call length s, inter-call interval s, calls
+
+# Must match CATEGORIES / CROW_RESPONSES in the app
+CATEGORY_IDS = ('kontaktrop', 'alarm', 'mobbing', 'matrop', 'territorial', 'rassel', 'juvenil', 'ovrigt')
+RESPONSE_IDS = ('approached', 'answered', 'ignored', 'fled', 'landed', 'group')
+# MediaRecorder output on iOS / Chrome / Firefox plus the XC formats
+AUDIO_MIMES  = ('audio/wav', 'audio/mpeg', 'audio/mp4', 'audio/webm', 'audio/ogg')
 
 # GitHub Pages base URL – used for og:image (social sharing preview)
 GITHUB_PAGES_URL = "https://expandtalk.github.io/crowtalk"
 
-def _b64_icon(filename):
-    """Return data URI for an icon file if it exists, else empty string."""
+# Inlined images – every byte is paid on each cold launch of index.html
+SONO_FORMAT   = 'PNG'    # palette PNG decodes everywhere; 'WEBP' (iOS 14+) or 'AVIF' (iOS 16+) are smaller
+SONO_FALLBACK = True     # with WEBP/AVIF, also embed the PNG for browsers without that decoder
+SONO_QUALITY  = 80
+ASSET_BUDGETS = {        # max bytes per inlined asset – the build fails when one is exceeded
+    'apple-touch-icon': 24 * 1024,
+    'favicon':           3 * 1024,
+    'topbar-logo':       8 * 1024,
+    'sono':             24 * 1024,
+    'classifier':       96 * 1024,
+    'dialect-grid':    128 * 1024,
+}
+_SONO_FMT = SONO_FORMAT if SONO_FORMAT == 'PNG' or features.check(SONO_FORMAT.lower()) else 'PNG'
+SONO_MIME = 'image/' + _SONO_FMT.lower()
+_over_budget = []
+
+def check_budget(kind, name, nbytes):
+    """Record an inlined asset that exceeds its ASSET_BUDGETS entry."""
+    if nbytes > ASSET_BUDGETS[kind]:
+        _over_budget.append(f"{name}: {nbytes/1024:.1f}KB > {kind} budget {ASSET_BUDGETS[kind]/1024:.0f}KB")
+
+def _png_bytes(img):
+    """Max-effort lossless PNG: zopfli deflate when the zopfli package is installed."""
+    buf = io.BytesIO()
+    img.save(buf, 'PNG', optimize=True)
+    data = buf.getvalue()
+    try:
+        import zopfli.png
+        return zopfli.png.optimize(data)
+    except ImportError:
+        return data
+
+_PNG_META_CHUNKS = (b'tEXt', b'zTXt', b'iTXt', b'tIME', b'eXIf')
+
+def strip_png(data):
+    """Drop text, timestamp and EXIF chunks (matplotlib writes its version, editors a save time)."""
+    out, i = [data[:8]], 8
+    while i + 8 <= len(data):
+        n = int.from_bytes(data[i:i + 4], 'big')
+        if data[i + 4:i + 8] not in _PNG_META_CHUNKS:
+            out.append(data[i:i + 12 + n])
+        i += 12 + n
+    return b''.join(out)
+
+def optimise_png(data, px=None):
+    """Smallest of: original, recompressed, palette-quantised – optionally downscaled to `px` wide. No metadata."""
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    candidates = [strip_png(data)]
+    if px and img.width > px:
+        img = img.resize((px, max(1, img.height * px // img.width)), Image.LANCZOS)
+        candidates = []
+    candidates.append(_png_bytes(img))
+    if img.mode in ('RGB', 'RGBA'):
+        method = Image.Quantize.FASTOCTREE if img.mode == 'RGBA' else Image.Quantize.MEDIANCUT
+        candidates.append(_png_bytes(img.quantize(256, method=method)))
+    return min(candidates, key=len)
+
+def encode_sono(png):
+    """Re-encode matplotlib's spectrogram PNG as SONO_FORMAT."""
+    if _SONO_FMT == 'PNG':
+        return optimise_png(png)
+    buf = io.BytesIO()
+    Image.open(io.BytesIO(png)).convert('RGB').save(
+        buf, _SONO_FMT, quality=SONO_QUALITY, **({'method': 6} if _SONO_FMT == 'WEBP' else {}))
+    return buf.getvalue()
+
+ICON_FILES = ('icon-180.png', 'icon-32.png', 'icon-192.png')
+
+def _b64_icon(filename, budget, px=None):
+    """Return an optimised data URI for an icon file if it exists, else empty string."""
     path = os.path.join(_HERE, filename)
     if not os.path.exists(path):
         return ''
-    ext = filename.rsplit('.', 1)[-1].lower()
-    mime = {'png': 'image/png', 'ico': 'image/x-icon', 'svg': 'image/svg+xml'}.get(ext, 'image/png')
-    with open(path, 'rb') as f:
-        return f'data:{mime};base64,{base64.b64encode(f.read()).decode()}'
-
-ICON_180   = _b64_icon('icon-180.png')   # Apple Touch Icon
-ICON_32    = _b64_icon('icon-32.png')    # Favicon
-ICON_APPLE = ICON_180 or _b64_icon('icon-192.png')  # fallback to 192
-
-print("🔊 Laddar ljudfiler...")
-
-# Known GPS coordinates for XC recordings (lat, lon from xeno-canto.org metadata)
-XC_COORDS = {
-    'XC736923':  (59.33, 18.07),   # Stockholm, Sweden
-    'XC1077561': (59.33, 18.07),   # Stockholm, Sweden
-    'XC1077566': (59.33, 18.07),   # Stockholm, Sweden
-    'XC1077567': (59.33, 18.07),   # Stockholm, Sweden
-    'XC1078236': (57.70, 11.97),   # Gothenburg, Sweden
-    'XC1079819': (55.60, 13.00),   # Malmö, Sweden
-    'XC1079820': (55.60, 13.00),   # Malmö, Sweden
-    'XC1080420': (59.85, 17.63),   # Uppsala, Sweden
-}
-
-recordings = []
-for fname in sorted(os.listdir(AUDIO_DIR)):
-    if not (fname.endswith('.wav') or fname.endswith('.mp3')):
-        continue
-    path = os.path.join(AUDIO_DIR, fname)
-    size = os.path.getsize(path)
-    if size > MAX_SIZE:
-        print(f"  ↩ skip  {fname}  ({size//1024}KB)")
-        continue
-    xc_id = fname.split(' ')[0]
-    base_no_ext = os.path.splitext(fname)[0]
-    parts = base_no_ext.split(' - ', 1)
-    fname_label = parts[1].strip() if len(parts) > 1 else base_no_ext
-    mime  = 'audio/wav' if fname.endswith('.wav') else 'audio/mpeg'
-    coords = XC_COORDS.get(xc_id)
-    with open(path, 'rb') as f:
-        b64 = base64.b64encode(f.read()).decode('utf-8')
-    sono = make_sono(path)
-    recordings.append({'id': xc_id, 'fname_label': fname_label, 'mime': mime, 'size': size, 'audio': b64,
-                        'lat': coords[0] if coords else None,
-                        'lon': coords[1] if coords else None,
-                        'sono': sono})
-    sono_kb = f"  +{len(sono)//1024}KB sono" if sono else "  (no sono)"
-    print(f"  ✓ {xc_id}  {size//1024}KB{sono_kb}")
-
-print(f"\n  → {len(recordings)} inspelningar inbäddade\n")
-
-REC_JSON = json.dumps([
-    {'id': r['id'], 'fname_label': r['fname_label'], 'mime': r['mime'], 'size': r['size'], 'audio': r['audio'],
-     'lat': r['lat'], 'lon': r['lon'], 'sono': r['sono']}
-    for r in recordings
-], ensure_ascii=False)
-
-html = f"""<!DOCTYPE html>
+    key, st = f"{filename}@{px or ''}", _stamp(path)
+    entry = _manifest['icons'].get(key)
+    if not (entry and entry['stamp'] == st and _use_cache):
+        ext = filename.rsplit('.', 1)[-1].lower()
+        mime = {'png': 'image/png', 'ico': 'image/x-icon', 'svg': 'image/svg+xml'}.get(ext, 'image/png')
+        with open(path, 'rb') as f:
+            data = f.read()
+        if ext == 'png':
+            data = optimise_png(data, px)
+        entry = _manifest['icons'][key] = {'stamp': st, 'size': len(data),
+                                           'uri': f'data:{mime};base64,{base64.b64encode(data).decode()}'}
+    check_budget(budget, filename, entry['size'])
+    return entry['uri']
+
+def no_derivatives(licence):
+    """
+    True for a Creative Commons ND licence ("CC BY-NC-ND 4.0", ".../licenses/by-nd/4.0/"),
+    and for a missing one: until the licence is known, modifying the recording isn't allowed either.
+    """
+    return not (licence or '').strip() or 'nd' in re.split(r'[^a-z]+', licence.lower())
+
+def process_audio(raw, mime, original=False):
+    """
+    Decode once, trim + normalise, re-encode, and render the spectrogram and
+    features from the same signal. Returns {'audio': b64, 'size', 'sono', 'feat', 'calls', 'dur', 'peak', 'rms'}
+    for the embedded audio, plus 'start'/'gain' playback hints when the
+    original bytes have to be kept (no encoder, or `original` for ND-licensed recordings).
+    """
+    out = {'audio': base64.b64encode(raw).decode('utf-8'), 'size': len(raw), 'sono': None}
+    with stage('decode'):
+        dec = decode_audio(raw)
+    if dec is None:
+        return out
+    data, sr = dec['data'], dec['sr']
+    with stage('trim'):
+        trimmed, start, gain = trim_and_normalise(data, sr)
+    with stage('encode'):
+        enc = None if original else encode_audio(trimmed, sr, mime)
+    played = trimmed if enc is not None else data
+    with stage('resample'):
+        analysis = to_analysis_rate(played, sr)   # resampled once, shared by all analysis steps
+    with stage('stft'):
+        f, power = stft_power(analysis)            # …and transformed once
+    with stage('analyse'):
+        calls = segment_calls(f, power)
+        out['feat'] = extract_features(f, power, calls)
+        out['calls'] = pack_calls(calls)
+    out['sono'], png = make_sono(analysis, ANALYSIS_SR, (f, power))   # stages 'render' + 'sono'
+    if png:
+        out['sono_png'] = png
+    if enc is not None:
+        with stage('encode'):
+            out.update(audio=base64.b64encode(enc).decode('utf-8'), size=len(enc), **audio_stats(trimmed, sr))
+    else:
+        out.update(start=round(start, 3), gain=round(gain, 3),
+                   dur=dec['dur'], peak=dec['peak'], rms=dec['rms'])
+    return out
+
+_PROCESS_VERSION = 8   # bump when process_audio() output changes
+_PROCESS_PARAMS = repr((_PROCESS_VERSION, TRIM_FRAME, TRIM_PAD, ONSET_DB, TARGET_RMS_DB, PEAK_LIMIT,
+                        FEAT_NFFT, FEAT_HOP, SEG_OFF_DB, SEG_FLUX_K, SEG_MIN_CALL, SEG_MIN_GAP, SEG_MIN_ICI,
+                        _SONO_FMT, SONO_QUALITY, SONO_FALLBACK, FFMPEG is not None))
+
+_use_cache = True   # --no-cache: reprocess every file (the cache is still rewritten)
+_memo      = {}     # content key → process_audio() output, kept between builds in --watch
+_fragments = {}     # (content key, metadata) → RECORDINGS entry JSON, likewise
+
+def content_key(raw, original=False):
+    return hashlib.sha1(raw + _PROCESS_PARAMS.encode() + (b'|original' if original else b'')).hexdigest()
+
+def cached_process(raw, mime, key=None, original=False):
+    """
+    process_audio() cached on disk by content hash + processing parameters.
+    With raw=None only the cache under `key` is consulted (None on a miss).
+    """
+    key = key or content_key(raw, original)
+    path = os.path.join(CACHE_DIR, 'audio', key + '.json')
+    if _use_cache and key in _memo:
+        return _memo[key]
+    if _use_cache and os.path.exists(path):
+        with stage('cache'), open(path, encoding='utf-8') as f:
+            out = json.load(f)
+    elif raw is None:
+        return None
+    else:
+        out = process_audio(raw, mime, original)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(out, f)
+    _memo[key] = out
+    return out
+
+# --- Incremental builds ------------------------------------------------------------
+# .cache/manifest.json records per input file its stamp (mtime, size) and what
+# was derived from it: the content key of a ljud/ recording (so unchanged files
+# are neither read nor hashed) and the data URI of an icon. It also holds a
+# fingerprint of every input of the last page written; when nothing changed
+# the build stops there. The page itself is reassembled from per-recording
+# JSON fragments, which --watch keeps in memory between rebuilds.
+_MANIFEST_VERSION = 2
+_manifest = {'audio': {}, 'icons': {}}
+
+def _stamp(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+def nfc(name):
+    return unicodedata.normalize('NFC', name)
+
+def listdir_sorted(path):
+    """os.listdir() in the same order on every platform: by NFC name (macOS returns NFD), then code point."""
+    return sorted(os.listdir(path), key=lambda n: (nfc(n), n))
+
+_SCRIPT_UNSAFE = str.maketrans({'<': '\\u003c', '>': '\\u003e', '&': '\\u0026',
+                                '\u2028': '\\u2028', '\u2029': '\\u2029'})
+
+def canonical_json(obj):
+    """
+    Sorted keys, no whitespace, UTF-8: equal values always give equal bytes.
+    <, >, & and U+2028/2029 are \\u-escaped, so contributed text can't close the
+    inline <script> it is embedded in.
+    """
+    return json.dumps(obj, sort_keys=True, separators=(',', ':'), ensure_ascii=False).translate(_SCRIPT_UNSAFE)
+
+def load_manifest():
+    try:
+        with open(os.path.join(CACHE_DIR, 'manifest.json'), encoding='utf-8') as f:
+            m = json.load(f)
+    except (OSError, ValueError):
+        m = {}
+    if m.get('version') != [_MANIFEST_VERSION, _PROCESS_PARAMS]:
+        m = {'version': [_MANIFEST_VERSION, _PROCESS_PARAMS], 'audio': {}, 'icons': {}}
+    return m
+
+def save_manifest():
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(os.path.join(CACHE_DIR, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(_manifest, f, separators=(',', ':'))
+
+def input_stamps():
+    """{path: stamp} of everything the page is built from – this script (the template) included."""
+    paths = [os.path.abspath(__file__), CLASSIFIER_FILE, DIALECT_FILE] + [os.path.join(_HERE, n) for n in ICON_FILES]
+    for d in (AUDIO_DIR, CONTRIB_DIR):
+        if os.path.isdir(d):
+            paths += [os.path.join(d, n) for n in listdir_sorted(d)]
+    return {p: _stamp(p) for p in paths if os.path.isfile(p)}
+
+_ASSET_FIELDS = ('audio', 'sono', 'sono_png', 'calls')   # fixed by the content key
+_BUILD_SLOT = '@BUILD@'   # replaced by the page's content hash
+
+def rec_fragment(r, used):
+    """JSON of one RECORDINGS entry, reused while its content key and metadata are unchanged."""
+    entry = {'id': r['id'], 'fname_label': r['fname_label'], 'mime': r['mime'], 'size': r['size'], 'audio': r['audio'],
+             'lat': r['lat'], 'lon': r['lon'], 'sono': r['sono'],
+             **{k: r[k] for k in ('sono_png', 'dur', 'peak', 'rms', 'start', 'gain', 'calls', 'category', 'response', 'place', 'recTime',
+                                  'date', 'recordist', 'licence', 'type', 'quality', 'locality') if k in r}}
+    if '_key' not in r:
+        return canonical_json(entry)
+    memo = (r['_key'], repr([(k, v) for k, v in entry.items() if k not in _ASSET_FIELDS]))
+    used[memo] = _fragments.get(memo) or canonical_json(entry)
+    return used[memo]
+
+@contextmanager
+def _read_bundle(path):
+    """Yield (export dict, audio loader) for a .json or .zip export bundle; a zip is closed on exit."""
+    if path.endswith('.zip'):
+        with zipfile.ZipFile(path) as zf:
+            meta_name = next((n for n in zf.namelist() if n.endswith('.json')), None)
+            if meta_name is None:
+                raise ValueError('no .json in the zip')
+            data = json.loads(zf.read(meta_name).decode('utf-8'))
+            def load(rec):
+                if rec.get('file'):
+                    return zf.read(rec['file'])
+                return base64.b64decode(rec['audio']) if rec.get('audio') else None
+            yield data, load
+        return
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    yield data, lambda rec: base64.b64decode(rec['audio']) if rec.get('audio') else None
+
+def _validate_contribution(rec, raw):
+    """Return a normalised RECORDINGS entry, or raise ValueError explaining the rejection."""
+    if not raw:
+        raise ValueError('no audio')
+    if len(raw) > MAX_SIZE:
+        raise ValueError(f'{len(raw)//1024}KB > {MAX_SIZE//1024//1024}MB')
+    mime = (rec.get('mime') or '').split(';')[0].strip().lower()
+    if mime == 'audio/x-wav':
+        mime = 'audio/wav'
+    if mime not in AUDIO_MIMES:
+        raise ValueError(f'unsupported audio type {mime!r}')
+    cat = rec.get('category') or ''
+    if cat and cat not in CATEGORY_IDS:
+        raise ValueError(f'unknown category {cat!r}')
+    resp = rec.get('response') or ''
+    if resp and resp not in RESPONSE_IDS:
+        raise ValueError(f'unknown response {resp!r}')
+    lat = lon = None
+    gps = rec.get('gps')
+    if gps:
+        try:
+            lat, lon = float(gps['lat']), float(gps['lon'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f'bad gps {gps!r}')
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise ValueError(f'gps out of range {lat},{lon}')
+    for k in ('phonetic', 'place', 'recTime'):
+        if rec.get(k) is not None and not isinstance(rec[k], str):
+            raise ValueError(f'{k} is not text: {rec[k]!r}')
+    label = rec.get('phonetic') or rec.get('place') or 'Field recording'
+    dur = rec.get('duration')
+    return {'id': 'CT' + hashlib.sha1(raw).hexdigest()[:10], 'fname_label': label.strip(),
+            'mime': mime,
+            # app-reported duration for formats the build can't decode (webm/mp4)
+            **({'dur': round(dur, 2)} if isinstance(dur, (int, float)) and 0 < dur < 1e6 else {}),
+            **cached_process(raw, mime),
+            'lat': lat, 'lon': lon, 'category': cat, 'response': resp,
+            'place': rec.get('place') or '', 'recTime': rec.get('recTime')}
+
+def load_classifier():
+    """
+    Weights from CLASSIFIER_FILE, validated against CLS_PARAMS / CATEGORY_IDS.
+    Returns the dict to embed, or None when the file is absent or doesn't fit this build.
+    """
+    if not os.path.exists(CLASSIFIER_FILE):
+        return None
+    name = os.path.basename(CLASSIFIER_FILE)
+    try:
+        with open(CLASSIFIER_FILE, encoding='utf-8') as f:
+            m = json.load(f)
+        if m.get('format') != CLS_FORMAT:
+            raise ValueError(f"format {m.get('format')!r}, expected {CLS_FORMAT}")
+        if m.get('params') != CLS_PARAMS:
+            raise ValueError('trained with different analysis parameters – retrain')
+        unknown = set(m['classes']) - set(CATEGORY_IDS)
+        if unknown:
+            raise ValueError(f'unknown classes {sorted(unknown)}')
+        if len(m['mu']) != CLS_DIM or len(m['sd']) != CLS_DIM:
+            raise ValueError('input normalisation has the wrong size')
+        n_in = CLS_DIM
+        for layer in m['layers']:
+            n_out, n = layer['shape']
+            if n != n_in or len(base64.b64decode(layer['w'])) != n_out * n or len(layer['b']) != n_out:
+                raise ValueError('layer shapes do not chain')
+            n_in = n_out
+        if n_in != len(m['classes']):
+            raise ValueError('output size does not match classes')
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"  ⚠ {name} ignoreras ({e})")
+        return None
+    model = {k: m[k] for k in ('format', 'version', 'classes', 'mu', 'sd', 'layers')}
+    check_budget('classifier', name, len(json.dumps(model)))
+    print(f"  ✓ {name}  v{m['version']}  {len(m['classes'])} klasser")
+    return model
+
+def load_dialect_grid():
+    """Cells from DIALECT_FILE for the map layer, or None when absent / from another format."""
+    if not os.path.exists(DIALECT_FILE):
+        return None
+    name = os.path.basename(DIALECT_FILE)
+    try:
+        with open(DIALECT_FILE, encoding='utf-8') as f:
+            g = json.load(f)
+        if g.get('format') != DIALECT_FORMAT or g.get('features') != list(DIALECT_FEATURES):
+            raise ValueError('written by another version of dialect_grid.py – rerun it')
+        width = 3 + 4 * len(DIALECT_FEATURES)
+        if not all(len(row) == width for row in g['cells']) or not g['cell'] > 0:
+            raise ValueError('malformed cells')
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"  ⚠ {name} ignoreras ({e})")
+        return None
+    grid = {k: g[k] for k in ('format', 'cell', 'features', 'n', 'cells')}
+    check_budget('dialect-grid', name, len(json.dumps(grid, separators=(',', ':'))))
+    print(f"  ✓ {name}  {len(g['cells'])} rutor, {g['n']} inspelningar")
+    return grid
+
+def load_contributions():
+    """Read reviewed app export bundles from bidrag/ and return validated recordings."""
+    if not os.path.isdir(CONTRIB_DIR):
+        return []
+    out, seen = [], set()
+    for bname in listdir_sorted(CONTRIB_DIR):
+        if not (bname.endswith('.json') or bname.endswith('.zip')):
+            continue
+        try:
+            with _read_bundle(os.path.join(CONTRIB_DIR, bname)) as (data, load):
+                for rec in data.get('fieldRecordings', []):
+                    try:
+                        with profiled(f"{bname}#{rec.get('id')}"):
+                            r = _validate_contribution(rec, load(rec))
+                    except (ValueError, KeyError, TypeError, zipfile.BadZipFile) as e:
+                        print(f"  ↩ skip  {bname}#{rec.get('id')}  ({e})")
+                        continue
+                    if r['id'] in seen:
+                        continue
+                    seen.add(r['id'])
+                    out.append(r)
+                    if r['sono'] is None:
+                        print(f"  ⚠ {r['id']}  {r['size']//1024}KB  ← {bname}: {r['mime']} kunde inte avkodas"
+                              f" – inbäddas oförändrad utan spektrogram, anrop och likhet"
+                              f"{'' if FFMPEG else ' (installera ffmpeg)'}")
+                    else:
+                        print(f"  ✓ {r['id']}  {r['size']//1024}KB  +{len(r['sono'])//1024}KB sono  ← {bname}")
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            print(f"  ⚠ skip bundle {bname} ({e})")
+    return out
+
+META_FIELDS = ('id', 'lat', 'lon', 'date', 'recordist', 'licence', 'type', 'quality', 'locality', 'label')
+
+def _meta_row(d, default_id=None):
+    """Normalise one metadata record (CSV row or sidecar object)."""
+    row = {k: str(d[k]).strip() for k in META_FIELDS if d.get(k) not in (None, '')}
+    row.setdefault('id', default_id)
+    for k in ('lat', 'lon'):
+        if k in row:
+            try:
+                row[k] = float(row[k])
+            except ValueError:
+                print(f"    ⚠ {row['id']}: bad {k} {row[k]!r}")
+                del row[k]
+    return row
+
+def _parse_meta_file(path):
+    """Return the metadata rows in index.csv or a *.json sidecar."""
+    if path.endswith('.csv'):
+        with open(path, encoding='utf-8', newline='') as f:
+            return [_meta_row(d) for d in csv.DictReader(f) if d.get('id')]
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    stem = os.path.basename(path).split(' ')[0].split('.')[0]
+    rows = []
+    for d in (data if isinstance(data, list) else [data]):
+        if isinstance(d, dict):
+            rows.append(_meta_row(d, stem))
+        else:
+            print(f"    ⚠ {os.path.basename(path)}: skip {d!r} (not an object)")
+    return rows
+
+def load_metadata():
+    """
+    Load ljud/index.csv plus *.json sidecars into a dict keyed by XC id.
+    Parsed files are cached by mtime/size in .cache/, so a rebuild only
+    re-reads the sidecars that changed.
+    """
+    cache_path = os.path.join(CACHE_DIR, 'metadata.json')
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    names = [n for n in listdir_sorted(AUDIO_DIR) if n.endswith('.json')]
+    if os.path.exists(os.path.join(AUDIO_DIR, META_INDEX)):
+        names.insert(0, META_INDEX)   # sidecars override the index
+    fresh, meta = {}, {}
+    for name in names:
+        path = os.path.join(AUDIO_DIR, name)
+        st = os.stat(path)
+        stamp = [st.st_mtime_ns, st.st_size]
+        entry = cache.get(name)
+        if not entry or entry['stamp'] != stamp:
+            try:
+                entry = {'stamp': stamp, 'rows': _parse_meta_file(path)}
+            except (OSError, ValueError) as e:
+                print(f"  ⚠ skip metadata {name} ({e})")
+                continue
+        fresh[name] = entry
+        for row in entry['rows']:
+            meta.setdefault(row['id'], {}).update(row)
+    if fresh != cache:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(fresh, f)
+    return meta
+
+PROFILE_FILE = os.path.join(_HERE, "build_profile.json")
+
+def profile_report(path, wall, cpu, top=10):
+    """Write the --profile report as JSON and print the slowest stages and files."""
+    r4 = lambda x: round(x, 4)
+    def summary(stages):
+        return {'wall': r4(sum(v[0] for v in stages.values())), 'cpu': r4(sum(v[1] for v in stages.values())),
+                'peak': max((v[2] for v in stages.values()), default=0),
+                'stages': {k: {'wall': r4(w), 'cpu': r4(c), 'peak': p} for k, (w, c, p) in sorted(stages.items())}}
+    files = [{'file': name, **summary(st)} for name, st in sorted(_profile.items()) if name != '(build)']
+    by_stage = {}
+    for st in _profile.values():
+        for k, (w, c, p) in st.items():
+            a = by_stage.setdefault(k, {'wall': 0.0, 'cpu': 0.0, 'peak': 0, 'files': 0})
+            a['wall'] += w; a['cpu'] += c; a['peak'] = max(a['peak'], p); a['files'] += 1
+    try:
+        import resource   # POSIX; ru_maxrss is KiB on Linux, bytes on macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+    except ImportError:
+        rss = None
+    report = {
+        'format': 1, 'python': platform.python_version(), 'platform': platform.platform(), 'cache': _use_cache,
+        'total': {'wall': r4(wall), 'cpu': r4(cpu), 'peak_rss': rss, 'files': len(files)},
+        'stages': {k: {**v, 'wall': r4(v['wall']), 'cpu': r4(v['cpu'])} for k, v in sorted(by_stage.items())},
+        'build': summary(_profile.get('(build)', {})),
+        'files': files,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+
+    mb = lambda b: b / 1048576
+    print(f"\n⏱  Profil → {os.path.basename(path)}  (total {wall:.2f}s wall, {cpu:.2f}s cpu"
+          + (f", peak RSS {mb(rss):.0f} MB)" if rss else ")"))
+    print(f"  {'steg':<24}{'wall s':>9}{'cpu s':>9}{'peak MB':>9}{'filer':>7}{'andel':>7}")
+    for k, v in sorted(by_stage.items(), key=lambda kv: -kv[1]['wall']):
+        print(f"  {k:<24}{v['wall']:>9.3f}{v['cpu']:>9.3f}{mb(v['peak']):>9.1f}{v['files']:>7}{v['wall'] / wall:>7.0%}")
+    if files:
+        print(f"\n  {'långsammaste filer':<40}{'wall s':>9}{'cpu s':>9}{'peak MB':>9}  största steg")
+        for fr in sorted(files, key=lambda x: -x['wall'])[:top]:
+            worst = max(fr['stages'].items(), key=lambda kv: kv[1]['wall'])[0] if fr['stages'] else ''
+            print(f"  {fr['file'][:39]:<40}{fr['wall']:>9.3f}{fr['cpu']:>9.3f}{mb(fr['peak']):>9.1f}  {worst}")
+
+def build(profile=None, use_cache=True):
+    """
+    Embed ljud/ + bidrag/ recordings, icons and the classifier into OUTPUT.
+    With `profile` (a path), time every stage per file and write the report there.
+    """
+    global _profile, _use_cache, _manifest, _fragments
+    _use_cache = use_cache
+    _profile = None
+    _over_budget.clear()
+    _manifest = load_manifest()
+    inputs = hashlib.sha1(json.dumps([OUTPUT, input_stamps()]).encode()).hexdigest()
+    if use_cache and not profile and os.path.exists(OUTPUT) and _manifest.get('output') == [inputs, _stamp(OUTPUT)]:
+        print(f"✅ Inget ändrat → {OUTPUT}")
+        return
+    if profile:
+        import tracemalloc
+        import matplotlib.pyplot, scipy.signal   # lazy imports would be charged to the first file's stages
+        tracemalloc.start()
+        _profile = {}
+        w0, c0 = time.perf_counter(), time.process_time()
+    with stage('icons'):
+        ICON_180   = _b64_icon('icon-180.png', 'apple-touch-icon')   # Apple Touch Icon
+        ICON_32    = _b64_icon('icon-32.png', 'favicon')             # Favicon
+        ICON_APPLE = ICON_180 or _b64_icon('icon-192.png', 'apple-touch-icon', px=180)  # fallback to 192
+        # Top bar shows the logo at 36 CSS px – a 72 px (2×) copy instead of the 180 px icon
+        ICON_TOPBAR = _b64_icon('icon-180.png', 'topbar-logo', px=72) or _b64_icon('icon-192.png', 'topbar-logo', px=72)
+
+    print("🔊 Laddar ljudfiler...")
+
+    META = load_metadata()
+
+    recordings, audio_seen = [], {}
+    for fname in listdir_sorted(AUDIO_DIR):
+        if not (fname.endswith('.wav') or fname.endswith('.mp3')):
+            continue
+        path = os.path.join(AUDIO_DIR, fname)
+        fname = nfc(fname)   # ids and labels as on any other platform
+        size = os.path.getsize(path)
+        if size > MAX_SIZE:
+            print(f"  ↩ skip  {fname}  ({size//1024}KB)")
+            continue
+        xc_id = fname.split(' ')[0]
+        meta  = META.get(xc_id, {})
+        base_no_ext = os.path.splitext(fname)[0]
+        parts = base_no_ext.split(' - ', 1)
+        fname_label = meta.get('label') or (parts[1].strip() if len(parts) > 1 else base_no_ext)
+        mime  = 'audio/wav' if fname.endswith('.wav') else 'audio/mpeg'
+        original = no_derivatives(meta.get('licence'))   # ND or unknown: embed the bytes as published, trim/gain as hints
+        with profiled(fname):
+            st, entry = _stamp(path), _manifest['audio'].get(fname)
+            fresh = entry and entry['stamp'] == st and entry.get('original', False) == original
+            proc = cached_process(None, mime, entry['key']) if fresh else None
+            if proc is None:
+                with stage('read'), open(path, 'rb') as f:
+                    raw = f.read()
+                entry = {'stamp': st, 'key': content_key(raw, original), **({'original': True} if original else {})}
+                proc = cached_process(raw, mime, entry['key'], original)
+        audio_seen[fname] = entry
+        sono = proc['sono']
+        recordings.append({'id': xc_id, 'fname_label': fname_label, 'mime': mime, '_key': entry['key'], **proc,
+                            'lat': meta.get('lat'), 'lon': meta.get('lon'),
+                            **{k: meta[k] for k in ('date', 'recordist', 'licence', 'type', 'quality', 'locality')
+                               if k in meta}})
+        sono_kb = f"  +{len(sono)//1024}KB sono" if sono else "  (no sono)"
+        n_calls = f"  {len(proc['calls']) // 2} läten" if 'calls' in proc else ""
+        print(f"  ✓ {xc_id}  {size//1024}KB → {proc['size']//1024}KB{sono_kb}{n_calls}")
+
+    unattributed = [r['id'] for r in recordings if not (r.get('recordist') and r.get('licence'))]
+    if unattributed:
+        print(f"  ⚠ recordist/licence saknas i {META_INDEX} (CC kräver attribution – kör xc_metadata.py):"
+              f" {', '.join(unattributed)}")
+    _manifest['audio'] = audio_seen
+    for key in set(_memo) - {e['key'] for e in audio_seen.values()}:
+        del _memo[key]   # removed or changed recordings (bundle entries are reloaded from disk)
+    contributed = load_contributions()
+    recordings += contributed
+
+    print(f"\n  → {len(recordings)} inspelningar inbäddade ({len(contributed)} bidrag)\n")
+
+    CLASSIFIER = load_classifier()
+    DIALECT = load_dialect_grid()
+
+    for r in recordings:
+        if r['sono']:
+            check_budget('sono', f"{r['id']} sono", len(r['sono']) * 3 // 4)
+    if _over_budget:
+        print("❌ Inlined asset budget exceeded (see ASSET_BUDGETS):")
+        for line in _over_budget:
+            print(f"  {line}")
+        sys.exit(1)
+
+    with stage('html'):
+        used = {}
+        REC_JSON = '[' + ','.join(rec_fragment(r, used) for r in recordings) + ']'   # = canonical_json(list)
+        _fragments = used
+        FEAT_JSON = canonical_json(feature_table(recordings))
+        DIALECT_JSON = canonical_json(DIALECT)
+        CLS_JSON = canonical_json({'model': CLASSIFIER, 'cfg': {**CLS_PARAMS, 'frame': TRIM_FRAME, 'off_db': SEG_OFF_DB,
+                                                                 'min_call': SEG_MIN_CALL, 'min_gap': SEG_MIN_GAP,
+                                                                 'bout_gap': SEG_BOUT_GAP}})
+
+        html = f"""<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="UTF-8">
@@ -142,6 +1003,7 @@ html = f"""<!DOCTYPE html>
 <meta name="apple-mobile-web-app-status-bar-style" content="black">
 <meta name="apple-mobile-web-app-title" content="CrowTalk">
 <meta name="description" content="Study and communicate with corvids — works fully offline on iPhone">
+<meta name="build" content="{_BUILD_SLOT}">
 <meta property="og:title" content="CrowTalk">
 <meta property="og:description" content="Field tool for studying hooded crows — sound library, recorder, journal. Offline-first on iPhone.">
 <meta property="og:image" content="{GITHUB_PAGES_URL}/social.png">
@@ -319,7 +1181,26 @@ body{{font-family:-apple-system,BlinkMacSystemFont,'SF Pro Text',system-ui,sans-
 .player-sub{{font-size:13px;color:var(--t3);text-align:center;font-family:monospace;margin-bottom:12px}}
 .sono-wrap{{position:relative;margin:0 0 16px;border-radius:8px;overflow:hidden;border:1px solid var(--border)}}
 .sono-wrap img{{width:100%;display:block}}
-.sono-playhead{{position:absolute;top:0;bottom:0;width:2px;background:var(--green);opacity:0.85;pointer-events:none;transform:translateX(0)}}
+.player-credit{{font-size:10px;color:var(--t3);text-align:center;margin:-10px 0 14px;font-family:monospace}}
+.player-credit:empty{{display:none}}
+.perf-overlay{{position:fixed;top:calc(env(safe-area-inset-top) + 6px);right:6px;z-index:9999;max-width:80vw;padding:6px 8px;border-radius:8px;
+  background:rgba(7,9,10,0.9);border:1px solid var(--border);font:10px/1.4 monospace;color:var(--t2)}}
+.perf-overlay table{{border-collapse:collapse}}
+.perf-overlay td,.perf-overlay th{{padding:0 4px;text-align:right;font-weight:normal}}
+.perf-overlay td:first-child,.perf-overlay th:first-child{{text-align:left}}
+.perf-btns{{display:flex;gap:4px;margin-top:4px}}
+.perf-btns button{{font:inherit;color:var(--t1);background:var(--s2);border:1px solid var(--border);border-radius:4px;padding:2px 6px}}
+.dialect-chips{{display:flex;flex-wrap:wrap;gap:6px;margin-bottom:8px}}
+.dialect-map{{width:100%;display:block;border-radius:8px;border:1px solid var(--border);margin-bottom:6px;cursor:crosshair}}
+.dialect-info{{font-size:11px;color:var(--t3);font-family:monospace;line-height:1.5}}
+.similar-row{{display:flex;flex-wrap:wrap;gap:6px;justify-content:center;align-items:center;margin:-6px 0 14px;max-width:100%}}
+.similar-row:empty{{display:none}}
+.similar-lbl{{font-size:10px;color:var(--t3);text-transform:uppercase;letter-spacing:0.5px}}
+.similar-chip{{padding:4px 10px;border-radius:14px;border:1px solid var(--border);background:var(--s2);color:var(--t2);font-size:11px;cursor:pointer;max-width:140px;overflow:hidden;text-overflow:ellipsis;white-space:nowrap}}
+.sono-playhead{{position:absolute;top:0;bottom:0;left:0;width:100%;pointer-events:none;will-change:transform}}   /* translateX(%) of its own width = of the image */
+.sono-playhead::before{{content:'';position:absolute;top:0;bottom:0;left:0;width:2px;background:var(--green);opacity:0.85}}
+.sono-call{{position:absolute;border-left:1px solid var(--amber);border-right:1px solid rgba(245,166,35,0.4);background:rgba(245,166,35,0.10);pointer-events:none}}
+.sono-call span{{position:absolute;top:1px;left:2px;font-size:9px;line-height:1;color:var(--amber);font-family:monospace}}
 
 /* Big play button */
 .big-play{{
@@ -339,7 +1220,7 @@ body{{font-family:-apple-system,BlinkMacSystemFont,'SF Pro Text',system-ui,sans-
   width:100%;height:4px;background:var(--s3);border-radius:2px;
   overflow:hidden;cursor:pointer;margin-bottom:6px
 }}
-.prog-fill{{height:100%;background:var(--green);width:0%;transition:width 0.1s linear;border-radius:2px}}
+.prog-fill{{height:100%;background:var(--green);transform:scaleX(0);transform-origin:0 0;will-change:transform}}
 .prog-times{{display:flex;justify-content:space-between;font-family:monospace;font-size:11px;color:var(--t3)}}
 
 /* Controls row */
@@ -388,6 +1269,9 @@ input[type=range]::-webkit-slider-thumb{{
   font-size:13px;color:var(--t2);background:var(--s2);cursor:pointer;transition:all 0.12s
 }}
 .player-chip.selected{{background:var(--gdim);border-color:var(--green);color:var(--green);font-weight:500}}
+.player-chip.suggested:not(.selected){{border-style:dashed;border-color:var(--amber);color:var(--amber)}}
+.player-suggest{{font-size:11px;color:var(--amber);margin:-4px 0 10px}}
+.player-suggest:empty{{display:none}}
 .player-save-row{{display:flex;gap:8px}}
 .player-notes{{
   flex:1;background:var(--s2);border:1px solid var(--border);color:var(--t1);
@@ -476,7 +1360,7 @@ input[type=range]::-webkit-slider-thumb{{
 .field-del{{padding:6px;background:none;border:none;color:var(--t3);cursor:pointer;font-size:20px}}
 .field-prog{{padding:0 12px 10px;display:flex;align-items:center;gap:8px}}
 .field-prog-track{{flex:1;height:3px;background:var(--s3);border-radius:2px;overflow:hidden}}
-.field-prog-fill{{height:100%;background:var(--green);width:0%}}
+.field-prog-fill{{height:100%;background:var(--green);transform:scaleX(0);transform-origin:0 0}}
 .field-prog-time{{font-family:monospace;font-size:10px;color:var(--t3)}}
 
 /* ── DAGBOK TAB ─────────────────────────────────────────────────── */
@@ -673,7 +1557,7 @@ input[type=range]::-webkit-slider-thumb{{
 <div class="shell">
 
   <div class="topbar">
-    {'<img src="' + ICON_APPLE + '" alt="CrowTalk">' if ICON_APPLE else ''}
+    {'<img src="' + ICON_TOPBAR + '" alt="CrowTalk">' if ICON_TOPBAR else ''}
     <div>
       <h1>CrowTalk</h1>
       <p id="topSub">Corvus cornix</p>
@@ -1452,8 +2336,11 @@ input[type=range]::-webkit-slider-thumb{{
 
     <div class="sono-wrap" id="sonoWrap" style="display:none">
       <img id="sonoImg" alt="Spectrogram">
+      <div id="sonoCalls"></div>
       <div class="sono-playhead" id="sonoPlayhead"></div>
     </div>
+    <div class="player-credit" id="playerCredit"></div>
+    <div class="similar-row" id="similarRow"></div>
 
     <button class="big-play paused" id="bigPlay">
       <svg id="bigPlayIcon" viewBox="0 0 24 24" fill="currentColor"><path d="M8 5v14l11-7z"/></svg>
@@ -1522,6 +2409,7 @@ input[type=range]::-webkit-slider-thumb{{
     </div>
     <div class="player-label-title">Categorise</div>
     <div class="player-chips" id="playerChips"></div>
+    <div class="player-suggest" id="playerSuggest"></div>
     <div class="player-save-row">
       <textarea class="player-notes" id="playerNotes" placeholder="Notes, context, weather, location…" rows="2"></textarea>
       <button class="player-save" onclick="savePlayerLabel()">Save</button>
@@ -1548,7 +2436,12 @@ input[type=range]::-webkit-slider-thumb{{
 // ═══════════════════════════════════════════════════════════════════
 // DATA
 // ═══════════════════════════════════════════════════════════════════
+const BUILD = '{_BUILD_SLOT}';   // content hash of this page – equal hashes, identical bytes
 const RECORDINGS = {REC_JSON};
+// Quantised acoustic features – one int8 row per RECORDINGS entry (see feature_table in the build)
+const FEATURES = {FEAT_JSON};
+const DIALECT = {DIALECT_JSON};   // dialect_grid.json cells for the map layer (null until generated)
+const CLS = {CLS_JSON};   // {{model, cfg}}: classifier.json weights (null until trained) + analysis parameters
 
 const CATEGORIES = [
   {{id:'kontaktrop',  label:'Contact call', note:'1–2 calls, soft'}},
@@ -1593,7 +2486,7 @@ if (navigator.geolocation) {{
 let fieldItems = [];
 async function loadFieldItems() {{
   if (!db) {{ fieldItems = []; return; }}
-  const recs = await dbGetAll('recordings');
+  const recs = await dbAll('recordings');
   const hqRaw = getHQName().trim().toLowerCase();
   fieldItems = recs.map(r => {{
     const placeRaw = (r.place||'').trim().toLowerCase();
@@ -1627,12 +2520,14 @@ function buildAllItems() {{
   let reals = RECORDINGS.map(r => {{
     const dist = (userLat && r.lat && r.lon) ? haversine(userLat, userLon, r.lat, r.lon) : null;
     const phonetic = lbl[r.id]?.phonetic || '';
-    const sizeMeta = (r.size/1024).toFixed(0) + ' KB · ' + (r.mime==='audio/wav'?'WAV':'MP3') + (dist!==null?' · '+Math.round(dist)+'km':'');
+    const fmtName  = {{'audio/wav':'WAV','audio/mpeg':'MP3'}}[r.mime] || r.mime.split('/')[1].toUpperCase();
+    const sizeMeta = (r.dur ? fmt(r.dur) + ' · ' : '') + (r.calls?.length ? r.calls.length/2 + '× · ' : '') + (r.size/1024).toFixed(0) + ' KB · ' + fmtName + (dist!==null?' · '+Math.round(dist)+'km':'');
+    const isContrib = r.id.startsWith('CT');
     return {{
-      id: r.id, type:'real', badge:'xc',
+      id: r.id, type:'real', badge: isContrib ? 'ct' : 'xc',
       name: lbl[r.id]?.name || r.fname_label || r.id,
-      sub: phonetic || sizeMeta,
-      cat: lbl[r.id]?.category || '',
+      sub: phonetic || (isContrib && r.place ? r.place + ' · ' : '') + sizeMeta,
+      cat: lbl[r.id]?.category || r.category || '',
       notes: lbl[r.id]?.notes || '',
       audio: r, synth: null, danger: false, dist,
     }};
@@ -1662,9 +2557,12 @@ function openDB() {{
     req.onerror  = () => rej(req.error);
   }});
 }}
-function dbAdd(store,r)    {{ return dbOp(store,'readwrite', s=>s.add(r)); }}
+function dbAdd(store,r)    {{ return dbOp(store,'readwrite', s=>s.add(r)).then(id=>{{ dbCache[store]?.push({{...r, id}}); return id; }}); }}
 function dbGetAll(store)   {{ return dbOp(store,'readonly',  s=>s.getAll()); }}
-function dbDelete(store,id){{ return dbOp(store,'readwrite', s=>s.delete(id)); }}
+function dbDelete(store,id){{ return dbOp(store,'readwrite', s=>s.delete(id)).then(()=>{{ if (dbCache[store]) dbCache[store] = dbCache[store].filter(r=>r.id!==id); }}); }}
+// In-memory copy of a store (key order), read once – dbAdd/dbDelete keep it current
+const dbCache = {{}};
+async function dbAll(store) {{ return dbCache[store] || (dbCache[store] = await dbGetAll(store)); }}
 function dbOp(store,mode,fn) {{
   return new Promise((res,rej) => {{
     const tx=db.transaction(store,mode), req=fn(tx.objectStore(store));
@@ -1672,6 +2570,40 @@ function dbOp(store,mode,fn) {{
   }});
 }}
 
+// ═══════════════════════════════════════════════════════════════════
+// KEYED LISTS
+// ═══════════════════════════════════════════════════════════════════
+// Reconcile a container's children (data-key) with `items` in order: nodes for
+// kept keys are reused untouched, new keys are created from html(item), gone
+// ones removed – saving or deleting one entry touches one node. Clicks are
+// handled once per container (onListAction) instead of per card.
+function renderKeyed(list, items, key, html) {{
+  const keys = new Set(items.map(key));
+  const old  = new Map();
+  for (const el of [...list.children]) {{
+    if (el.dataset.key !== undefined && keys.has(el.dataset.key)) old.set(el.dataset.key, el);
+    else el.remove();
+  }}
+  if (!old.size) {{ list.innerHTML = items.map(html).join(''); return; }}   // first render: one parse
+  const tpl = document.createElement('template');
+  let cursor = list.firstElementChild;
+  for (const it of items) {{
+    let el = old.get(key(it));
+    if (!el) {{ tpl.innerHTML = html(it); el = tpl.content.firstElementChild; }}
+    if (el === cursor) cursor = cursor.nextElementSibling;
+    else list.insertBefore(el, cursor);
+  }}
+}}
+
+// Delegated clicks: <button data-act="play"> inside a [data-key] element → handlers.play(key, btn)
+function onListAction(list, handlers) {{
+  list.addEventListener('click', e => {{
+    const btn = e.target.closest('[data-act]');
+    const row = btn?.closest('[data-key]');
+    if (row && list.contains(row)) handlers[btn.dataset.act]?.(row.dataset.key, btn);
+  }});
+}}
+
 // ═══════════════════════════════════════════════════════════════════
 // JOURNAL SUB-NAV
 // ═══════════════════════════════════════════════════════════════════
@@ -1708,25 +2640,27 @@ function switchTab(name) {{
 // ═══════════════════════════════════════════════════════════════════
 let activeFilters = new Set(['all']);
 
+// Chips are built once; afterwards only their 'on' class follows activeFilters
 function renderFilterBar() {{
   const bar = document.getElementById('filterBar');
-  const typeFilters = [
-    {{id:'all',   label:'All',          cls:''}},
-    {{id:'real',  label:'🔵 Real',      cls:'type-real'}},
-    {{id:'synth', label:'🟡 Synthetic', cls:'type-synth'}},
-    ...CATEGORIES.map(c=>( {{id:'cat_'+c.id, label:c.label, cls:''}} )),
-  ];
-  bar.innerHTML = `
-    <div class="filter-row">
-      <button class="filter-chip field-hq ${{activeFilters.has('field_hq')?'on':''}}" data-fid="field_hq">🏠 Home Quarter</button>
-      <button class="filter-chip field-new ${{activeFilters.has('field_new')?'on':''}}" data-fid="field_new">🌲 New Territory</button>
-    </div>
-    <div class="filter-row">
-      ${{typeFilters.map(f=>`<button class="filter-chip ${{f.cls}} ${{activeFilters.has(f.id)?'on':''}}" data-fid="${{f.id}}">${{f.label}}</button>`).join('')}}
-    </div>`;
-  bar.querySelectorAll('.filter-chip').forEach(btn => {{
-    btn.addEventListener('click', () => {{
-      const fid = btn.dataset.fid;
+  if (!bar.firstElementChild) {{
+    const typeFilters = [
+      {{id:'all',   label:'All',          cls:''}},
+      {{id:'real',  label:'🔵 Real',      cls:'type-real'}},
+      {{id:'synth', label:'🟡 Synthetic', cls:'type-synth'}},
+      ...CATEGORIES.map(c=>( {{id:'cat_'+c.id, label:c.label, cls:''}} )),
+    ];
+    bar.innerHTML = `
+      <div class="filter-row">
+        <button class="filter-chip field-hq" data-fid="field_hq">🏠 Home Quarter</button>
+        <button class="filter-chip field-new" data-fid="field_new">🌲 New Territory</button>
+      </div>
+      <div class="filter-row">
+        ${{typeFilters.map(f=>`<button class="filter-chip ${{f.cls}}" data-fid="${{f.id}}">${{f.label}}</button>`).join('')}}
+      </div>`;
+    bar.addEventListener('click', e => {{
+      const fid = e.target.closest('.filter-chip')?.dataset.fid;
+      if (!fid) return;
       if (fid === 'all') {{
         activeFilters = new Set(['all']);
       }} else {{
@@ -1738,7 +2672,8 @@ function renderFilterBar() {{
       renderFilterBar();
       renderSoundList();
     }});
-  }});
+  }}
+  for (const chip of bar.querySelectorAll('.filter-chip')) chip.classList.toggle('on', activeFilters.has(chip.dataset.fid));
 }}
 
 function getFilteredItems() {{
@@ -1932,6 +2867,7 @@ const HELP={{
 <ul style="padding-left:18px;margin:0 0 10px;line-height:1.9">
 <li><b>SYN</b> (amber) — Synthesized via Web Audio</li>
 <li><b>XC</b> (blue) — Real recordings from xeno-canto.org</li>
+<li><b>CT</b> (blue) — Verified community field recordings</li>
 <li><b>🎙</b> (purple) — Your own field recordings</li>
 <li><b>⚠</b> (red) — Alarm / danger calls — use with care</li>
 </ul>
@@ -1995,14 +2931,14 @@ function renderSoundList() {{
       <div class="mini-play" id="mp-${{item.id}}">
         <svg viewBox="0 0 24 24" fill="currentColor"><path d="M8 5v14l11-7z"/></svg>
       </div>
-      <div class="type-badge ${{isDanger?'danger':item.type}}">${{isDanger?'⚠':item.type==='real'?'XC':item.type==='field'?'🎙':'SYN'}}</div>
+      <div class="type-badge ${{isDanger?'danger':item.type}}">${{isDanger?'⚠':item.type==='real'?item.badge.toUpperCase():item.type==='field'?'🎙':'SYN'}}</div>
       <div class="sound-info">
-        <div class="sound-name">${{item.name}}${{isDanger?' ⚠️':''}}</div>
-        <div class="sound-meta">${{item.sub}}</div>
+        <div class="sound-name">${{escHtml(item.name)}}${{isDanger?' ⚠️':''}}</div>
+        <div class="sound-meta">${{escHtml(item.sub)}}</div>
       </div>
       ${{isDanger
         ? `<span class="sound-cat danger-cat">Warning</span>`
-        : hasCat ? `<span class="sound-cat labeled">${{catLabel}}</span>` : `<span class="sound-cat"></span>`
+        : hasCat ? `<span class="sound-cat labeled">${{escHtml(catLabel)}}</span>` : `<span class="sound-cat"></span>`
       }}
     </div>`;
   }}).join('');
@@ -2038,13 +2974,38 @@ document.getElementById('alarmConfirm').onclick = () => {{
   alarmModalCallback = null;
 }};
 
+// ═══════════════════════════════════════════════════════════════════
+// ANIMATION LOOP
+// ═══════════════════════════════════════════════════════════════════
+// One requestAnimationFrame loop for everything that follows playback (player
+// progress + spectrogram playhead, field card progress). Tasks run once per
+// frame; the loop stops when none are left or the page is backgrounded.
+const animTasks = new Map();   // name → fn(now)
+let animRaf = 0;
+function animFrame(now) {{
+  animRaf = 0;
+  for (const fn of animTasks.values()) fn(now);
+  if (animTasks.size && !document.hidden) animRaf = requestAnimationFrame(animFrame);
+}}
+function animStart(name, fn) {{
+  animTasks.set(name, fn);
+  if (!animRaf && !document.hidden) animRaf = requestAnimationFrame(animFrame);
+}}
+function animStop(name) {{
+  animTasks.delete(name);
+  if (!animTasks.size && animRaf) {{ cancelAnimationFrame(animRaf); animRaf = 0; }}
+}}
+document.addEventListener('visibilitychange', () => {{
+  if (document.hidden) {{ cancelAnimationFrame(animRaf); animRaf = 0; }}
+  else if (animTasks.size && !animRaf) animRaf = requestAnimationFrame(animFrame);
+}});
+
 // ═══════════════════════════════════════════════════════════════════
 // FIELD PLAYER
 // ═══════════════════════════════════════════════════════════════════
 const mainAudio = document.getElementById('mainAudio');
 let playerIdx   = 0;
 let loopOn      = false;
-let progInt     = null;
 let playerRecArmed = false;
 let playerRecChunks = [];
 let playerMediaRec  = null;
@@ -2079,18 +3040,32 @@ function loadPlayerItem() {{
   }}
   document.getElementById('playerTitle').textContent = item.name;
   document.getElementById('playerSub').textContent   = item.sub;
+  // Attribution for XC recordings (licence terms require crediting the recordist)
+  const a = item.type === 'real' ? item.audio : null;
+  document.getElementById('playerCredit').textContent = a && (a.recordist || a.licence)
+    ? [a.recordist ? '© ' + a.recordist : '', a.licence, a.locality, a.date, a.quality ? 'Q:' + a.quality : '']
+        .filter(Boolean).join(' · ')
+    : '';
 
   // Spectrogram
   const sonoWrap = document.getElementById('sonoWrap');
   const sonoImg  = document.getElementById('sonoImg');
   const sonoSrc  = item.type === 'real' ? item.audio?.sono : null;
   if (sonoSrc) {{
-    sonoImg.src = 'data:image/png;base64,' + sonoSrc;
+    const png = item.audio.sono_png;
+    sonoImg.onerror = () => {{   // no WebP/AVIF decoder: the PNG fallback, else no image
+      if (png && !sonoImg.src.startsWith('data:image/png')) sonoImg.src = 'data:image/png;base64,' + png;
+      else sonoWrap.style.display = 'none';
+    }};
+    sonoImg.src = sonoUrlCache[item.id]?.url || 'data:{SONO_MIME};base64,' + sonoSrc;
     sonoWrap.style.display = 'block';
-    document.getElementById('sonoPlayhead').style.left = '0px';
+    progEls.head.style.transform = `translateX(${{sonoPct(0, 1)}}%)`;
   }} else {{
     sonoWrap.style.display = 'none';
   }}
+  renderCallMarks(item);
+
+  renderSimilar(item);
 
   // Big play button styling for danger sounds
   const bigPlay = document.getElementById('bigPlay');
@@ -2101,7 +3076,7 @@ function loadPlayerItem() {{
 
   // Label chips (only for real recordings)
   const lbl = getLabels();
-  const savedCat      = item.type==='real' ? (lbl[item.id]?.category||'') : item.cat;
+  const savedCat      = item.type==='real' ? (lbl[item.id]?.category||item.audio?.category||'') : item.cat;
   const savedNotes    = item.type==='real' ? (lbl[item.id]?.notes||'') : '';
   const savedName     = item.type==='real' ? (lbl[item.id]?.name || item.id) : '';
   const savedPhonetic = item.type==='real' ? (lbl[item.id]?.phonetic||'') : '';
@@ -2112,20 +3087,27 @@ function loadPlayerItem() {{
     document.getElementById('playerNameInput').placeholder = item.id + ' — custom name...';
     document.getElementById('playerPhonetic').value = savedPhonetic;
     document.getElementById('playerTolkning').value = savedTolkning;
+    const sug = savedCat ? null : suggestCategory(itemCalls(item));
     document.getElementById('playerChips').innerHTML = CATEGORIES.map(c => `
-      <button class="player-chip ${{c.id===savedCat?'selected':''}}" data-cat="${{c.id}}"
+      <button class="player-chip ${{c.id===savedCat?'selected':''}} ${{c.id===sug?.cat?'suggested':''}}" data-cat="${{c.id}}"
         onclick="selectPlayerChip(this)">${{c.label}}</button>`).join('');
+    document.getElementById('playerSuggest').textContent = sug
+      ? `Suggested: ${{CATEGORIES.find(c => c.id === sug.cat).label}} — ${{sug.why}}` : '';
     document.getElementById('playerNotes').value = savedNotes;
   }}
 
   // Big play button reset
   setBigPlay(false);
-  document.getElementById('progFill').style.width  = '0%';
+  progEls.fill.style.transform = 'scaleX(0)';
   document.getElementById('progCur').textContent   = '0:00';
-  document.getElementById('progDur').textContent   = '0:00';
+  document.getElementById('progDur').textContent   = fmt(item.audio?.dur || item.fieldRec?.duration || 0);
 
   // Kommunikationsguide
   updateCommGuide(item);
+
+  // <audio> fallback: load the prefetched blob now so the tap only has to play()
+  if (blobUrlCache[item.id] && usesElement(item)) loadMain(item, blobUrlCache[item.id]);
+  prefetchAround(playerIdx);
 }}
 
 function selectPlayerChip(btn) {{
@@ -2205,7 +3187,7 @@ function updateCommGuide(item) {{
   if (!item || item.type === 'synth') {{ guide.style.display='none'; return; }}
   guide.style.display='block';
   const lbl = getLabels();
-  const cat = lbl[item.id]?.category || '';
+  const cat = lbl[item.id]?.category || item.audio?.category || '';
   const data = COMM_GUIDE_DATA[cat] || COMM_GUIDE_DATA[''];
   document.getElementById('commText').textContent = data.text;
   const sug = document.getElementById('commSuggest');
@@ -2222,19 +3204,124 @@ function updateCommGuide(item) {{
 }}
 
 function jumpToSound(synthId) {{
-  // Hitta och öppna ett specifikt synth-ljud i spelaren
+  // Hitta och öppna ett specifikt ljud i spelaren
   const idx = filteredItems.findIndex(it => it.id === synthId);
-  if (idx >= 0) {{ playerIdx = idx; loadPlayerItem(); openPlayer(); }}
+  if (idx >= 0) {{ openPlayer(idx); }}
   else {{
     // Kliv ur filter och sök globalt
-    activeFilter=''; renderFilterBar(); renderSoundList();
+    activeFilters = new Set(['all']); renderFilterBar(); renderSoundList();
     setTimeout(()=>{{
       const idx2 = filteredItems.findIndex(it => it.id === synthId);
-      if (idx2 >= 0) {{ playerIdx=idx2; loadPlayerItem(); openPlayer(); }}
+      if (idx2 >= 0) openPlayer(idx2);
     }}, 100);
   }}
 }}
 
+// ── Call segmentation (build-time onsets/offsets in RECORDINGS[].calls) ──
+// calls = [on, off, on, off, …] in centiseconds on the embedded audio's timeline
+const SONO_AXES = {canonical_json(SONO_AXES)};   // plot area of the spectrogram image (left, bottom, width, height)
+
+function sonoPct(t, dur) {{
+  const f = dur > 0 ? Math.min(1, Math.max(0, t / dur)) : 0;
+  return (SONO_AXES[0] + SONO_AXES[2] * f) * 100;
+}}
+
+function itemCalls(item) {{
+  const c = item.audio?.calls;
+  if (!c) return null;
+  const out = [];
+  for (let i = 0; i + 1 < c.length; i += 2) out.push([c[i] / 100, c[i+1] / 100]);
+  return out;
+}}
+
+// Call count and inter-call intervals (s) – the cues the guide teaches
+function callStats(calls) {{
+  const ici = calls.slice(1).map((c, i) => +(c[0] - calls[i][0]).toFixed(2));
+  const mean = a => a.length ? a.reduce((s, x) => s + x, 0) / a.length : 0;
+  return {{n: calls.length, ici, iciMean: mean(ici), callMean: mean(calls.map(c => c[1] - c[0]))}};
+}}
+
+// Calls split at silences longer than SEG_BOUT_GAP – a crow repeats a bout, the rule counts one
+function callBouts(calls) {{
+  const bouts = [];
+  calls.forEach((c, i) => {{
+    if (!i || c[0] - calls[i-1][1] > CLS.cfg.bout_gap) bouts.push([]);
+    bouts[bouts.length - 1].push(c);
+  }});
+  return bouts;
+}}
+
+// Rule of thumb from CATEGORIES notes: 1–2 contact, 3 fast alarm, 5+ mobbing, short clicks rattle.
+// Judged on the last bout, so a take with several bouts is not summed into "mobbing".
+function suggestCategory(calls) {{
+  if (!calls || !calls.length) return null;
+  const bouts = callBouts(calls), s = callStats(bouts[bouts.length - 1]);
+  const why = `${{s.n}} call${{s.n > 1 ? 's' : ''}}` + (s.ici.length ? `, ${{s.iciMean.toFixed(2)}} s apart` : '')
+    + (bouts.length > 1 ? ` in the last of ${{bouts.length}} bouts` : '');
+  let cat = '';
+  if (s.n >= 3 && s.callMean < 0.08 && s.iciMean < 0.2) cat = 'rassel';
+  else if (s.n >= 5)                                      cat = 'mobbing';
+  else if (s.n === 3 && s.iciMean < 0.6)                  cat = 'alarm';
+  else if (s.n <= 2)                                      cat = 'kontaktrop';
+  return cat ? {{cat, why}} : null;
+}}
+
+function renderCallMarks(item) {{
+  const box = document.getElementById('sonoCalls');
+  const calls = itemCalls(item), dur = item.audio?.dur;
+  if (!calls || !dur) {{ box.innerHTML = ''; return; }}
+  const top = (1 - SONO_AXES[1] - SONO_AXES[3]) * 100, h = SONO_AXES[3] * 100;
+  box.innerHTML = calls.map(([on, off], i) => {{
+    const l = sonoPct(on, dur), w = Math.max(0.4, sonoPct(off, dur) - l);
+    return `<div class="sono-call" style="left:${{l.toFixed(2)}}%;width:${{w.toFixed(2)}}%;top:${{top.toFixed(2)}}%;height:${{h.toFixed(2)}}%"><span>${{i+1}}</span></div>`;
+  }}).join('');
+}}
+
+// ── Sounds like this (cosine similarity over FEATURES) ───────────────
+const REC_INDEX = new Map(RECORDINGS.map((r,i) => [r.id, i]));
+const FEAT = (() => {{
+  const dim = FEATURES.dim;
+  if (!dim) return null;
+  const raw = atob(FEATURES.data), q = new Int8Array(raw.length);
+  for (let i = 0; i < raw.length; i++) q[i] = raw.charCodeAt(i) << 24 >> 24;
+  const n = q.length / dim, norms = new Float32Array(n);
+  for (let r = 0; r < n; r++) {{
+    let s = 0;
+    for (let j = r*dim; j < (r+1)*dim; j++) s += q[j]*q[j];
+    norms[r] = Math.sqrt(s);
+  }}
+  return {{q, dim, n, norms}};
+}})();
+
+function similarRecordings(recIdx, k=4) {{
+  if (!FEAT || !FEAT.norms[recIdx]) return [];
+  const {{q, dim, n, norms}} = FEAT, base = recIdx*dim, best = [];
+  for (let r = 0; r < n; r++) {{
+    if (r === recIdx || !norms[r]) continue;
+    let dot = 0;
+    for (let j = 0, o = r*dim; j < dim; j++) dot += q[base+j]*q[o+j];
+    const sim = dot / (norms[recIdx]*norms[r]);
+    if (sim <= 0) continue;
+    if (best.length < k || sim > best[best.length-1].sim) {{
+      best.push({{idx:r, sim}}); best.sort((a,b) => b.sim - a.sim);
+      if (best.length > k) best.pop();
+    }}
+  }}
+  return best;
+}}
+
+function renderSimilar(item) {{
+  const row = document.getElementById('similarRow');
+  const recIdx = item.type === 'real' ? REC_INDEX.get(item.id) : undefined;
+  const sims = recIdx === undefined ? [] : similarRecordings(recIdx);
+  if (!sims.length) {{ row.innerHTML = ''; return; }}
+  const lbl = getLabels();
+  row.innerHTML = '<span class="similar-lbl">Sounds like</span>' + sims.map(s => {{
+    const r = RECORDINGS[s.idx];
+    return `<button class="similar-chip" onclick="jumpToSound('${{r.id}}')" title="${{Math.round(s.sim*100)}}% similar">${{escHtml(lbl[r.id]?.name || r.fname_label || r.id)}}</button>`;
+  }}).join('');
+}}
+
 function toggleCommGuide() {{
   const body = document.getElementById('commGuideBody');
   const arrow = document.getElementById('commArrow');
@@ -2279,9 +3366,219 @@ function getBlobUrl(item) {{
   const blob   = new Blob([bytes], {{type: mime}});
   const url    = URL.createObjectURL(blob);
   blobUrlCache[item.id] = url;
+  prefetchHold(item.id, blob.size);
   return url;
 }}
 
+// ── Prefetch: the items around playerIdx, decoded at idle priority ───
+// Blob URLs (base64 decoded natively via fetch), spectrogram images and, once
+// an AudioContext exists, decoded AudioBuffers – so a swipe never waits on a
+// decode and the tap only has to play(). Least recently used items outside the
+// window are dropped when the total goes over PREFETCH_BUDGET.
+const PREFETCH_AHEAD  = 2;                   // items on each side of the current one
+const PREFETCH_BUDGET = 48 * 1024 * 1024;    // bytes of blobs + PCM held for prefetched items
+const sonoUrlCache = {{}};                     // id → {{url, img}} (img keeps the decoded bitmap alive)
+const pcmCache     = new Map();              // id → AudioBuffer
+const prefetchBytes = new Map();             // id → bytes held, least recently used first
+let prefetchQueue = [], prefetchKeep = new Set(), prefetchGen = 0;
+const whenIdle = window.requestIdleCallback
+  ? cb => requestIdleCallback(cb, {{timeout: 400}})
+  : cb => setTimeout(cb, 30);
+
+function prefetchHold(id, bytes) {{
+  prefetchBytes.set(id, (prefetchBytes.get(id) || 0) + bytes);
+}}
+
+async function fetchBlob(url) {{
+  return (await fetch(url)).blob();
+}}
+
+function prefetchAround(idx) {{
+  const gen = ++prefetchGen;
+  prefetchQueue = [];
+  prefetchKeep  = new Set();
+  for (let d = 0; d <= PREFETCH_AHEAD; d++) {{
+    for (const i of d ? [idx + d, idx - d] : [idx]) {{
+      const it = filteredItems[i];
+      if (!it || it.type === 'synth') continue;
+      prefetchQueue.push(it);
+      prefetchKeep.add(it.id);
+      if (prefetchBytes.has(it.id)) {{            // mark as recently used
+        const b = prefetchBytes.get(it.id);
+        prefetchBytes.delete(it.id); prefetchBytes.set(it.id, b);
+      }}
+    }}
+  }}
+  whenIdle(() => prefetchStep(gen));
+}}
+
+// One item per idle slot; a newer prefetchAround() abandons the rest of the queue
+function prefetchStep(gen) {{
+  if (gen !== prefetchGen || !prefetchQueue.length) return;
+  prefetchItem(prefetchQueue.shift())
+    .catch(e => console.warn('prefetch failed:', e))
+    .finally(() => {{ prefetchEvict(); whenIdle(() => prefetchStep(gen)); }});
+}}
+
+async function prefetchItem(item) {{
+  if (!blobUrlCache[item.id]) {{
+    const blob = item.type === 'field' ? item.fieldRec?.blob
+      : await fetchBlob(`data:${{item.audio.mime}};base64,${{item.audio.audio}}`);
+    if (!blob || blobUrlCache[item.id]) return;
+    blobUrlCache[item.id] = URL.createObjectURL(blob);
+    prefetchHold(item.id, blob.size);
+    if (item === filteredItems[playerIdx] && !playerPlaying() && usesElement(item)) loadMain(item, blobUrlCache[item.id]);
+  }}
+  const sono = item.type === 'real' ? item.audio?.sono : null;
+  if (sono && !sonoUrlCache[item.id]) {{
+    let blob = await fetchBlob('data:{SONO_MIME};base64,' + sono);
+    let img  = new Image();
+    img.src = URL.createObjectURL(blob);
+    if (!await img.decode().then(() => true, () => false) && item.audio.sono_png) {{   // no WebP/AVIF decoder
+      URL.revokeObjectURL(img.src);
+      blob = await fetchBlob('data:image/png;base64,' + item.audio.sono_png);
+      img  = new Image();
+      img.src = URL.createObjectURL(blob);
+      await img.decode().catch(() => {{}});
+    }}
+    sonoUrlCache[item.id] = {{url: img.src, img}};
+    prefetchHold(item.id, blob.size + img.naturalWidth * img.naturalHeight * 4);
+  }}
+  // PCM only once the user has started audio – never create an AudioContext here
+  if (audioCtx && !usesElement(item)) await decodeItem(item).catch(() => pcmFailed.add(item.id));
+}}
+
+function prefetchEvict() {{
+  let total = 0;
+  for (const b of prefetchBytes.values()) total += b;
+  for (const [id, b] of prefetchBytes) {{
+    if (total <= PREFETCH_BUDGET) break;
+    if (prefetchKeep.has(id) || blobUrlCache[id] === mainAudio.src) continue;
+    if (blobUrlCache[id]) {{ URL.revokeObjectURL(blobUrlCache[id]); delete blobUrlCache[id]; }}
+    if (sonoUrlCache[id]) {{ URL.revokeObjectURL(sonoUrlCache[id].url); delete sonoUrlCache[id]; }}
+    pcmCache.delete(id);
+    prefetchBytes.delete(id);
+    total -= b;
+  }}
+}}
+
+// Point mainAudio at an item (trim/gain hints applied) without playing it
+function loadMain(item, url) {{
+  mainAudio.src = url;
+  mainAudio.load();
+  // Originals the build could not re-encode carry trim/gain hints instead
+  const start = item.audio?.start;
+  if (start) mainAudio.addEventListener('loadedmetadata', () => {{ mainAudio.currentTime = start; }}, {{once:true}});
+  mainAudio.volume = document.getElementById('volSlider').value * itemGain(item);
+}}
+
+// ── Playback engine ─────────────────────────────────────────────────
+// Real and field sounds play as decoded AudioBuffers on audioCtx: sample-accurate
+// start, gapless loop, exact seeking and a GainNode that can apply the build's
+// full gain hint. Files whose PCM would exceed PCM_MAX_BYTES (or that the
+// browser cannot decode) fall back to the <audio> element.
+const PCM_MAX_BYTES = 24 * 1024 * 1024;   // ≈ 70 s stereo at 44.1 kHz
+const pcmFailed = new Set();              // ids decodeAudioData rejected
+let waBuf = null, waSrc = null, waGain = null;
+let waT0 = 0, waOffset = null;    // audioCtx time and buffer position of the last start
+let waToken = 0, waPending = false;   // a tap waiting for its decode
+
+function usesElement(item) {{
+  const dur = item.audio?.dur || item.fieldRec?.duration || 0;
+  return !(window.AudioContext || window.webkitAudioContext) || pcmFailed.has(item.id)
+    || !dur || dur * (audioCtx?.sampleRate || 48000) * 8 > PCM_MAX_BYTES;
+}}
+
+function itemUrl(item) {{
+  if (item.type !== 'field') return getBlobUrl(item);
+  return blobUrlCache[item.id] || (blobUrlCache[item.id] = URL.createObjectURL(item.fieldRec.blob));
+}}
+
+async function decodeItem(item) {{
+  if (pcmCache.has(item.id)) return pcmCache.get(item.id);
+  const data = await (await fetch(itemUrl(item))).arrayBuffer();
+  const buf  = await new Promise((ok, fail) => audioCtx.decodeAudioData(data, ok, fail));  // callback form for older Safari
+  pcmCache.set(item.id, buf);
+  prefetchHold(item.id, buf.length * buf.numberOfChannels * 4);
+  return buf;
+}}
+
+function playerPlaying() {{ return !!waSrc || waPending || !mainAudio.paused; }}
+function playerDur()     {{ return waBuf ? waBuf.duration : (mainAudio.duration || 0); }}
+function playerTime() {{
+  if (!waBuf) return mainAudio.currentTime;
+  if (!waSrc) return waOffset || 0;
+  let t = waOffset + Math.max(0, audioCtx.currentTime - waT0);
+  if (waSrc.loop && t >= waSrc.loopEnd) t = waSrc.loopStart + (t - waSrc.loopStart) % (waSrc.loopEnd - waSrc.loopStart);
+  return Math.min(t, waBuf.duration);
+}}
+
+function sessionPlaybackEnd() {{
+  if (session?.cur) {{ session.cur.end = sessionNow(); session.cur = null; }}
+}}
+
+async function playBuffer(item) {{
+  initACtx();
+  const token = ++waToken;
+  let buf;
+  waPending = true;
+  try {{
+    buf = await decodeItem(item);
+  }} catch (e) {{
+    if (token !== waToken) return;
+    waPending = false;
+    console.warn('decode failed, using <audio>:', e);
+    pcmFailed.add(item.id);
+    loadMain(item, itemUrl(item));
+    mainAudio.play().catch(e => console.warn('play failed:', e));
+    return;
+  }}
+  if (token !== waToken) return;           // paused or swiped while decoding
+  waPending = false;
+  waBuf = buf;
+  startBuffer(item, waOffset ?? (item.audio?.start || 0));
+  prefetchAround(playerIdx);               // audioCtx exists now: neighbours get PCM too
+}}
+
+function startBuffer(item, offset) {{
+  const c = audioCtx;
+  if (!waGain) {{ waGain = c.createGain(); waGain.connect(c.destination); }}
+  waGain.gain.value = document.getElementById('volSlider').value * (item.audio?.gain || 1);
+  const src = c.createBufferSource();
+  src.buffer    = waBuf;
+  src.loop      = loopOn;
+  src.loopStart = item.audio?.start || 0;
+  src.loopEnd   = waBuf.duration;
+  src.connect(waGain);
+  const at = c.currentTime;
+  src.start(at, offset);
+  src.onended = () => {{
+    if (src !== waSrc) return;             // stopped by pause / seek / stopMain
+    waSrc = null; waOffset = null;
+    if (session) session.cur = null;       // its scheduled end is exact
+    setBigPlay(false); animStop('player');
+  }};
+  waSrc = src; waT0 = at; waOffset = offset;
+  if (session) session.cur = sessionPlayback(item.id, item.name, waBuf.duration - offset, offset, at);
+}}
+
+function stopBuffer() {{
+  waToken++;
+  waPending = false;
+  if (!waSrc) return;
+  waOffset = playerTime();
+  const src = waSrc;
+  waSrc = null;
+  src.stop(); src.disconnect();
+  sessionPlaybackEnd();
+}}
+
+function playerSeek(t) {{
+  if (!waBuf) {{ mainAudio.currentTime = t; return; }}
+  if (waSrc) {{ stopBuffer(); startBuffer(filteredItems[playerIdx], t); }}
+  else waOffset = t;
+}}
+
 function handleBigPlayClick() {{
   const item = filteredItems[playerIdx];
   if (!item) return;
@@ -2294,69 +3591,82 @@ function handleBigPlayClick() {{
     }}
     return;
   }}
-  // Real / field audio – use Blob URL for iOS Safari compatibility
-  let blobUrl;
-  if (item.type === 'field') {{
-    const blob = item.fieldRec?.blob;
-    if (!blob) return;
-    blobUrl = blobUrlCache[item.id] || (blobUrlCache[item.id] = URL.createObjectURL(blob));
-  }} else {{
-    blobUrl = getBlobUrl(item);
-  }}
-  if (mainAudio.paused) {{
-    if (mainAudio.src !== blobUrl) {{
-      mainAudio.src = blobUrl;
-      mainAudio.load();
+  if (item.type === 'field' && !item.fieldRec?.blob) return;
+  if (!playerPlaying()) {{
+    if (usesElement(item)) {{
+      const blobUrl = itemUrl(item);
+      if (mainAudio.src !== blobUrl) loadMain(item, blobUrl);
+      mainAudio.play().catch(e => console.warn('play failed:', e));
+    }} else {{
+      playBuffer(item);
     }}
-    mainAudio.play().catch(e => console.warn('play failed:', e));
     setBigPlay(true);
-    startProgTimer();
+    animStart('player', progFrame);
   }} else {{
+    stopBuffer();
     mainAudio.pause();
     setBigPlay(false);
-    clearInterval(progInt);
+    animStop('player');
   }}
 }}
 
 function stopMain() {{
-  clearInterval(progInt); progInt=null;
+  animStop('player');
+  stopBuffer();
+  waBuf = null; waOffset = null;
   mainAudio.pause();
   mainAudio.src = '';
   setBigPlay(false);
 }}
 
-function startProgTimer() {{
-  clearInterval(progInt);
-  progInt = setInterval(() => {{
-    if (!mainAudio.duration) return;
-    const pct = (mainAudio.currentTime/mainAudio.duration)*100;
-    document.getElementById('progFill').style.width = pct + '%';
-    document.getElementById('progCur').textContent  = fmt(mainAudio.currentTime);
-    document.getElementById('progDur').textContent  = fmt(mainAudio.duration);
-    // Animate spectrogram playhead
-    const sw = document.getElementById('sonoWrap');
-    if (sw && sw.style.display !== 'none') {{
-      document.getElementById('sonoPlayhead').style.left = pct + '%';
-    }}
-  }}, 100);
+// Player progress, run by the animation loop; element refs are cached and the
+// time labels are only rewritten when the displayed second changes
+const progEls = {{fill: document.getElementById('progFill'), cur: document.getElementById('progCur'),
+                  dur: document.getElementById('progDur'), head: document.getElementById('sonoPlayhead'),
+                  sono: document.getElementById('sonoWrap')}};
+let progLabel = '';
+function progFrame() {{
+  const dur = playerDur();
+  if (!dur) return;
+  const cur = playerTime();
+  progEls.fill.style.transform = `scaleX(${{Math.min(1, cur/dur)}})`;
+  const label = fmt(cur) + fmt(dur);
+  if (label !== progLabel) {{
+    progLabel = label;
+    progEls.cur.textContent = fmt(cur);
+    progEls.dur.textContent = fmt(dur);
+  }}
+  if (progEls.sono.style.display !== 'none') progEls.head.style.transform = `translateX(${{sonoPct(cur, dur)}}%)`;
 }}
 
+// <audio> fallback only – buffer sources loop natively
 mainAudio.onended = () => {{
   if (loopOn) {{ mainAudio.currentTime=0; mainAudio.play(); }}
-  else {{ setBigPlay(false); clearInterval(progInt); }}
+  else {{ setBigPlay(false); animStop('player'); }}
 }};
 
 document.getElementById('progTrack').onclick = e => {{
-  if (!mainAudio.duration) return;
+  const dur = playerDur();
+  if (!dur) return;
   const r = e.currentTarget.getBoundingClientRect();
-  mainAudio.currentTime = ((e.clientX-r.left)/r.width)*mainAudio.duration;
+  playerSeek(((e.clientX-r.left)/r.width)*dur);
 }};
 
-document.getElementById('volSlider').oninput = e => {{ mainAudio.volume = e.target.value; }};
+// Build-time loudness hint (only present when the file was embedded unprocessed); <audio> can't amplify
+function itemGain(item) {{ return Math.min(1, item?.audio?.gain || 1); }}
+document.getElementById('volSlider').oninput = e => {{
+  const item = filteredItems[playerIdx];
+  mainAudio.volume = e.target.value * itemGain(item);
+  if (waGain) waGain.gain.setTargetAtTime(e.target.value * (item?.audio?.gain || 1), audioCtx.currentTime, 0.01);
+}};
 
 function toggleLoop() {{
   loopOn = !loopOn;
   document.getElementById('loopBtn').classList.toggle('on', loopOn);
+  if (waSrc) {{                             // rebase so playerTime() stays right across the switch
+    waOffset = playerTime(); waT0 = audioCtx.currentTime;
+    waSrc.loop = loopOn;
+  }}
 }}
 
 function prevSound() {{
@@ -2381,38 +3691,113 @@ function nextSound() {{
 }})();
 
 // Record-in-player (quick field rec while player is open)
+// ── Playback-and-record session ──────────────────────────────────────
+// The player's Record button captures the mic on the audioCtx clock and logs
+// every playback on the same clock, so reply latency and count are measured.
+const ECHO_GUARD   = 0.15;   // s after a playback before a call counts as a reply (speaker bleed, reverb)
+const REPLY_WINDOW = 10;     // s after a playback in which calls count as replies to it
+let session = null;          // {{t0, plays:[{{id, name, t, end, offset}}], calls:[[on, off]], det, cur, outLat, inLat}}
+
+function sessionNow() {{ return audioCtx.currentTime - session.t0; }}
+
+// Log a playback starting at audioCtx time `at`; `offset` is the position in the sound (s)
+function sessionPlayback(id, name, dur, offset=0, at=audioCtx.currentTime) {{
+  if (!session) return null;
+  const t = at - session.t0, p = {{id, name, t, end: t + dur, offset}};
+  session.plays.push(p);
+  return p;
+}}
+
+// Device latency (s): a playback is heard outLat after its audioCtx time and a call reaches the
+// detector inLat after it is made, so a reply onset `on` compares to playback times as on - (outLat + inLat)
+function sessionLatency(c, stream) {{
+  const track = stream.getAudioTracks()[0];
+  return {{outLat: c.outputLatency || c.baseLatency || 0, inLat: track?.getSettings?.().latency || 0}};
+}}
+
+function sessionTrials(s) {{
+  const r3 = x => +x.toFixed(3), lag = s.outLat + s.inLat;
+  return s.plays.map((p, i) => {{
+    const until = Math.min(s.plays[i+1]?.t ?? Infinity, p.end + REPLY_WINDOW);
+    const replies = s.calls.filter(([on]) => on - lag >= p.end + ECHO_GUARD && on - lag < until);
+    return {{id: p.id, name: p.name, t: r3(p.t), end: r3(p.end), offset: r3(p.offset),
+             replies: replies.length, latency: replies.length ? r3(replies[0][0] - lag - p.end) : null}};
+  }});
+}}
+
+function showSessionReplies() {{
+  if (!session) return;
+  const n = sessionTrials(session).reduce((sum, t) => sum + t.replies, 0);
+  document.querySelector('#fieldRecToggle span').textContent = n ? `${{n}} repl${{n > 1 ? 'ies' : 'y'}}` : 'Record';
+}}
+
+// <audio> fallback: the element has no audioCtx start time, so log when it actually starts playing
+// (buffer playback is logged by startBuffer() with its exact start time)
+mainAudio.addEventListener('playing', () => {{
+  const item = filteredItems[playerIdx];
+  if (!session || !item) return;
+  session.cur = sessionPlayback(item.id, item.name,
+    (mainAudio.duration - mainAudio.currentTime) || 0, mainAudio.currentTime);
+}});
+['pause', 'ended'].forEach(ev => mainAudio.addEventListener(ev, sessionPlaybackEnd));
+
 async function toggleFieldRecFromPlayer() {{
   const btn = document.getElementById('fieldRecToggle');
   if (!playerRecArmed) {{
     try {{
+      const c = initACtx();
       const stream = await navigator.mediaDevices.getUserMedia({{audio:true}});
       const mimeType = ['audio/webm;codecs=opus','audio/webm','audio/ogg','audio/mp4']
         .find(m=>MediaRecorder.isTypeSupported(m)) || '';
       playerMediaRec  = new MediaRecorder(stream, mimeType?{{mimeType}}:{{}});
       playerRecChunks = [];
+      const s = session = {{t0: 0, plays: [], calls: [], det: null, cur: null, dur: 0, ...sessionLatency(c, stream)}};
       playerMediaRec.ondataavailable = e=>{{ if(e.data.size>0) playerRecChunks.push(e.data); }};
       playerMediaRec.onstop = async () => {{
         const blob = new Blob(playerRecChunks, {{type:playerRecChunks[0]?.type||'audio/webm'}});
         const currentItem = filteredItems[playerIdx];
         const context = currentItem ? currentItem.name : '';
-        await dbAdd('recordings', {{blob, category:'', notes:'Response to: '+context, ts:Date.now(), duration:0}});
+        Object.assign(s, sessionLatency(c, stream));   // outputLatency is often 0 until output has started
+        const trials  = sessionTrials(s);
+        const replies = trials.reduce((sum, t) => sum + t.replies, 0);
+        const first   = trials.find(t => t.latency !== null);
+        await dbAdd('recordings', {{blob, category:'', ts:Date.now(), duration:+s.dur.toFixed(3),
+          notes: 'Response to: ' + ([...new Set(trials.map(t => t.name))].join(', ') || context),
+          response: replies ? 'answered' : '',
+          calls: s.calls.flat().map(t => Math.round(t*100)),
+          session: {{plays: trials, outputLatency: +s.outLat.toFixed(3), inputLatency: +s.inLat.toFixed(3)}},
+          latency: first ? first.latency : null, replies}});
         stream.getTracks().forEach(t=>t.stop());
         switchTab('record');
         closePlayer();
         renderField();
       }};
       playerMediaRec.start(100);
+      s.t0 = c.currentTime;
+      // 5 ms detector frames: reply onsets to within a few ms
+      startLiveDetector(stream, (on, off) => {{ s.calls.push([on - s.t0, off - s.t0]); showSessionReplies(); }}, {{frame: 0.005}})
+        .then(det => {{ if (session === s) s.det = det; else stopLiveDetector(det); }});
+      if (playerPlaying()) session.cur = sessionPlayback(filteredItems[playerIdx]?.id, filteredItems[playerIdx]?.name,
+        (playerDur() - playerTime()) || 0, playerTime());
       playerRecArmed = true;
       btn.classList.add('on');
-    }} catch(err) {{ alert('Microphone access denied'); }}
+    }} catch(err) {{ session = null; alert('Microphone access denied'); }}
   }} else {{
     stopPlayerRec();
   }}
 }}
 function stopPlayerRec() {{
+  if (session) {{
+    if (session.cur) session.cur.end = sessionNow();
+    session.dur = sessionNow();
+    stopLiveDetector(session.det);
+    session = null;
+  }}
   if (playerMediaRec && playerMediaRec.state==='recording') playerMediaRec.stop();
   playerRecArmed = false;
-  document.getElementById('fieldRecToggle')?.classList.remove('on');
+  const btn = document.getElementById('fieldRecToggle');
+  btn?.classList.remove('on');
+  if (btn) btn.querySelector('span').textContent = 'Record';
 }}
 
 // ═══════════════════════════════════════════════════════════════════
@@ -2457,7 +3842,10 @@ function playSynth(id) {{
     content:()=>{{ for(let i=0;i<4;i++) setTimeout(()=>caw(420-i*10,0.2),i*350); return 1500; }},
     click:  ()=>{{ for(let i=0;i<5;i++) setTimeout(()=>rattle(),i*80); return 480; }},
   }};
+  const t0=audioCtx?.currentTime;
   const dur=patterns[id]?.() || 500;
+  // the pattern was scheduled from t0
+  if (session) sessionPlayback('syn_'+id, SYNTH_DEMOS.find(d => d.id === 'syn_'+id)?.name || id, dur/1000, 0, t0);
   setBigPlay(true);
   setTimeout(()=>{{ synthBusy=false; setBigPlay(false); }}, dur+150);
 }}
@@ -2478,7 +3866,7 @@ function fetchGPS(callback) {{
   );
 }}
 const fieldAudio = document.getElementById('fieldAudio');
-let fieldPlaying=null, fieldTimerInt=null, fieldURL=null;
+let fieldPlaying=null, fieldURL=null;
 
 document.getElementById('recordBtn').addEventListener('click',()=>{{
   if(mediaRec&&mediaRec.state==='recording') stopTabRecording();
@@ -2487,6 +3875,7 @@ document.getElementById('recordBtn').addEventListener('click',()=>{{
 
 async function startTabRecording() {{
   try {{
+    initACtx();   // still inside the tap, so iOS lets the live detector run
     const stream = await navigator.mediaDevices.getUserMedia({{audio:true}});
     const mimeType=['audio/webm;codecs=opus','audio/webm','audio/ogg','audio/mp4'].find(m=>MediaRecorder.isTypeSupported(m))||'';
     mediaRec=new MediaRecorder(stream,mimeType?{{mimeType}}:{{}});
@@ -2497,7 +3886,11 @@ async function startTabRecording() {{
     fetchGPS((gps, err) => {{ pendingGPS = gps; }});
     mediaRec.ondataavailable=e=>{{if(e.data.size>0)recChunks.push(e.data);}};
     mediaRec.onstop=finishTabRecording;
+    getClsWorker();   // warm up the classifier while recording
     mediaRec.start(100); recStart=Date.now();
+    liveCalls=[]; liveT0=audioCtx.currentTime;
+    startLiveDetector(stream, (on, off) => {{ liveCalls.push([Math.max(0, on-liveT0), off-liveT0]); showLiveCalls(); }})
+      .then(det => {{ if (mediaRec?.state === 'recording') liveDet = det; else stopLiveDetector(det); }});
     document.getElementById('recordBtn').classList.add('armed');
     document.getElementById('recHint').textContent='Tap to stop · fetching GPS…';
     document.getElementById('recTimer').classList.add('armed');
@@ -2505,6 +3898,7 @@ async function startTabRecording() {{
   }} catch(err) {{ alert('Microphone access denied: '+err.message); }}
 }}
 function stopTabRecording() {{
+  stopLiveDetector(liveDet); liveDet=null;
   if(mediaRec) {{mediaRec.stop(); mediaRec.stream.getTracks().forEach(t=>t.stop());}}
   clearInterval(recTimerInt);
   document.getElementById('recordBtn').classList.remove('armed');
@@ -2518,6 +3912,297 @@ function finishTabRecording() {{
   pendingAudio=new Audio(URL.createObjectURL(blob));
   showPending();
 }}
+// ── Live call detector (AudioWorklet) ────────────────────────────────
+// Frame energy against a tracked noise floor, with the same onset/offset
+// hysteresis and minimum call/gap lengths as segment_calls(). The processor
+// allocates nothing per block; it only posts a message per finished call.
+function callDetectorMain() {{
+  class CallDetector extends AudioWorkletProcessor {{
+    constructor(opts) {{
+      super();
+      const p = opts.processorOptions;
+      this.frameLen = Math.max(1, Math.round(sampleRate * p.frame));
+      this.onDb = p.onset_db; this.offDb = p.onset_db - p.off_db;
+      this.minCall = p.min_call; this.minGap = p.min_gap;
+      this.down = 1 - Math.exp(-p.frame / 0.1); this.up = 1 - Math.exp(-p.frame / 5);   // floor time constants (s)
+      this.acc = 0; this.n = 0; this.floor = NaN;
+      this.inCall = false; this.on = 0; this.lastAbove = 0; this.stopped = false;
+      this.port.onmessage = () => {{ this.stopped = true; }};
+    }}
+    frame(t) {{
+      const db = 10 * Math.log10(this.acc / this.frameLen + 1e-12);
+      if (this.floor !== this.floor) this.floor = db;          // NaN → first frame
+      if (this.inCall) {{
+        if (db > this.floor + this.offDb) this.lastAbove = t;
+        else if (t - this.lastAbove >= this.minGap) this.end();
+      }} else if (db > this.floor + this.onDb) {{
+        this.inCall = true; this.on = t - this.frameLen / sampleRate; this.lastAbove = t;
+      }} else {{
+        this.floor += (db < this.floor ? this.down : this.up) * (db - this.floor);
+      }}
+    }}
+    end() {{
+      this.inCall = false;
+      if (this.lastAbove - this.on >= this.minCall) this.port.postMessage({{on: this.on, off: this.lastAbove}});
+    }}
+    process(inputs) {{
+      if (this.stopped) {{
+        if (this.inCall) this.end();
+        return false;
+      }}
+      const ch = inputs[0] && inputs[0][0];
+      if (!ch) return true;
+      for (let i = 0; i < ch.length; i++) {{
+        this.acc += ch[i] * ch[i];
+        if (++this.n === this.frameLen) {{
+          this.frame(currentTime + (i + 1) / sampleRate);
+          this.acc = 0; this.n = 0;
+        }}
+      }}
+      return true;
+    }}
+  }}
+  registerProcessor('call-detector', CallDetector);
+}}
+
+let liveDet = null, liveCalls = [], liveT0 = 0, liveModuleCtx = null;
+
+// Run a call detector on a mic stream; onCall(on, off) gets audioCtx times (s).
+// opts override CLS.cfg (e.g. a shorter frame). Resolves to a handle for stopLiveDetector(), or null.
+async function startLiveDetector(stream, onCall, opts={{}}) {{
+  const c = initACtx();
+  if (!c.audioWorklet || typeof AudioWorkletNode === 'undefined') return null;
+  try {{
+    if (liveModuleCtx !== c) {{
+      const url = URL.createObjectURL(new Blob(['(' + callDetectorMain.toString() + ')()'], {{type: 'text/javascript'}}));
+      await c.audioWorklet.addModule(url);
+      liveModuleCtx = c;
+    }}
+    const src = c.createMediaStreamSource(stream), hp = c.createBiquadFilter();
+    hp.type = 'highpass'; hp.frequency.value = 300;             // same band floor as the batch detector
+    const node = new AudioWorkletNode(c, 'call-detector', {{
+      numberOfInputs: 1, numberOfOutputs: 0, processorOptions: {{...CLS.cfg, ...opts}}}});
+    node.port.onmessage = e => onCall(e.data.on, e.data.off);
+    src.connect(hp).connect(node);
+    return {{src, hp, node}};
+  }} catch (e) {{
+    console.warn('Live call detector unavailable:', e);
+    return null;
+  }}
+}}
+
+function stopLiveDetector(det) {{
+  if (!det) return;
+  det.node.port.postMessage('stop');   // flushes a call still in progress
+  det.src.disconnect(); det.hp.disconnect();
+}}
+
+function showLiveCalls() {{
+  if (!mediaRec || mediaRec.state !== 'recording') return;
+  const bouts = callBouts(liveCalls), n = bouts[bouts.length - 1].length, sug = suggestCategory(liveCalls);
+  const label = sug ? CATEGORIES.find(c => c.id === sug.cat).label.toLowerCase() : '';
+  document.getElementById('recHint').textContent = `Tap to stop · ` + (bouts.length > 1 ? `bout ${{bouts.length}}: ` : '')
+    + `${{n}} call${{n > 1 ? 's' : ''}}` + (label ? ` – ${{label}}?` : '');
+}}
+
+// ── On-device call classifier (Web Worker) ───────────────────────────
+// Log-mel features and the int8 MLP run off the main thread on plain typed
+// arrays. The worker mirrors classifier_input() in build_crowtalk.py; without
+// trained weights it still returns the energy-run calls for the count rule.
+function clsWorkerMain() {{
+  let cfg, N, NB, win, rev, twRe, twIm, fb, fbLo, fbHi, kLo, kHi, model = null, layers = null;
+
+  function setup(c, m) {{
+    cfg = c; N = c.nfft; NB = N / 2 + 1;
+    win = new Float64Array(N);
+    for (let i = 0; i < N; i++) win[i] = 0.5 - 0.5 * Math.cos(2 * Math.PI * i / (N - 1));   // np.hanning
+    const bits = Math.log2(N);
+    rev = new Uint16Array(N);
+    for (let i = 0; i < N; i++) {{
+      let r = 0;
+      for (let b = 0; b < bits; b++) r |= ((i >> b) & 1) << (bits - 1 - b);
+      rev[i] = r;
+    }}
+    twRe = new Float64Array(N / 2); twIm = new Float64Array(N / 2);
+    for (let i = 0; i < N / 2; i++) {{ twRe[i] = Math.cos(2 * Math.PI * i / N); twIm[i] = -Math.sin(2 * Math.PI * i / N); }}
+    // HTK-mel filterbank, same as mel_filterbank(); only the non-zero span of each filter is visited
+    const mel = hz => 2595 * Math.log10(1 + hz / 700), hz = m => 700 * (10 ** (m / 2595) - 1);
+    const M = c.n_mels, edges = [];
+    for (let i = 0; i < M + 2; i++) edges.push(hz(mel(c.fmax) * i / (M + 1)));
+    fb = new Float64Array(M * NB); fbLo = new Uint16Array(M); fbHi = new Uint16Array(M);
+    for (let m = 0; m < M; m++) {{
+      fbLo[m] = NB; fbHi[m] = 0;
+      for (let k = 0; k < NB; k++) {{
+        const f = k * c.sr / N, lo = edges[m], mid = edges[m + 1], hi = edges[m + 2];
+        const w = Math.max(0, Math.min((f - lo) / (mid - lo), (hi - f) / (hi - mid)));
+        fb[m * NB + k] = w;
+        if (w > 0) {{ fbLo[m] = Math.min(fbLo[m], k); fbHi[m] = k + 1; }}
+      }}
+    }}
+    kLo = Math.ceil(300 * N / c.sr); kHi = Math.floor(8000 * N / c.sr);
+    model = m;
+    layers = m && m.layers.map(L => {{
+      const raw = atob(L.w), w = new Int8Array(raw.length);
+      for (let i = 0; i < raw.length; i++) w[i] = raw.charCodeAt(i) << 24 >> 24;
+      return {{ nOut: L.shape[0], nIn: L.shape[1], w, scale: L.scale, b: Float32Array.from(L.b) }};
+    }});
+  }}
+
+  function fft(re, im) {{
+    for (let size = 2; size <= N; size <<= 1) {{
+      const half = size >> 1, step = N / size;
+      for (let i = 0; i < N; i += size) {{
+        for (let j = 0, t = 0; j < half; j++, t += step) {{
+          const a = i + j, b = a + half;
+          const xr = re[b] * twRe[t] - im[b] * twIm[t], xi = re[b] * twIm[t] + im[b] * twRe[t];
+          re[b] = re[a] - xr; im[b] = im[a] - xi;
+          re[a] += xr; im[a] += xi;
+        }}
+      }}
+    }}
+  }}
+
+  // x: mono Float32Array at cfg.sr → {{vec: Float32Array(cfg.dim), calls: [[on_s, off_s], …]}}
+  function features(x) {{
+    if (x.length < N) {{ const p = new Float32Array(N); p.set(x); x = p; }}
+    const M = cfg.n_mels, hop = cfg.hop, nF = Math.floor((x.length - N) / hop) + 1;
+    const re = new Float64Array(N), im = new Float64Array(N), pw = new Float64Array(NB);
+    const lm = new Float64Array(nF * M), db = new Float64Array(nF);
+    for (let fr = 0; fr < nF; fr++) {{
+      const off = fr * hop;
+      for (let i = 0; i < N; i++) {{ re[rev[i]] = x[off + i] * win[i]; im[i] = 0; }}
+      fft(re, im);
+      let e = 0;
+      for (let k = 0; k < NB; k++) {{
+        pw[k] = re[k] * re[k] + im[k] * im[k];
+        if (k >= kLo && k <= kHi) e += pw[k];
+      }}
+      db[fr] = 10 * Math.log10(Math.max(e, 1e-12));
+      for (let m = 0; m < M; m++) {{
+        let s = 0;
+        for (let k = fbLo[m]; k < fbHi[m]; k++) s += fb[m * NB + k] * pw[k];
+        lm[fr * M + m] = Math.log(s + 1e-10);
+      }}
+    }}
+    // Noise floor = 10th percentile (linear interpolation, as np.percentile)
+    const sorted = Float64Array.from(db).sort(), pos = 0.1 * (nF - 1), lo = Math.floor(pos);
+    const thr = sorted[lo] + (sorted[Math.min(lo + 1, nF - 1)] - sorted[lo]) * (pos - lo) + cfg.onset_db;
+    const runs = [];
+    for (let fr = 0; fr < nF; fr++) {{
+      if (db[fr] <= thr) continue;
+      if (runs.length && runs[runs.length - 1][1] === fr) runs[runs.length - 1][1] = fr + 1;
+      else runs.push([fr, fr + 1]);
+    }}
+    const active = new Uint8Array(nF).fill(runs.length ? 0 : 1);
+    for (const [a, b] of runs) active.fill(1, a, b);
+    const vec = new Float32Array(cfg.dim), nAct = active.reduce((s, v) => s + v, 0);
+    for (let m = 0; m < M; m++) {{
+      let s = 0, s2 = 0;
+      for (let fr = 0; fr < nF; fr++) if (active[fr]) {{ const v = lm[fr * M + m]; s += v; s2 += v * v; }}
+      const mean = s / nAct;
+      vec[m] = mean; vec[M + m] = Math.sqrt(Math.max(0, s2 / nAct - mean * mean));
+    }}
+    let level = 0;
+    for (let m = 0; m < M; m++) level += vec[m] / M;
+    for (let m = 0; m < M; m++) vec[m] -= level;
+    const spf = hop / cfg.sr, ici = runs.slice(1).map((r, i) => (r[0] - runs[i][0]) * spf);
+    const mean = a => a.length ? a.reduce((s, v) => s + v, 0) / a.length : 0;
+    const iciMean = mean(ici);
+    vec[2 * M] = runs.length;
+    vec[2 * M + 1] = iciMean;
+    vec[2 * M + 2] = Math.sqrt(mean(ici.map(v => (v - iciMean) ** 2)));
+    vec[2 * M + 3] = mean(runs.map(r => (r[1] - r[0]) * spf));
+
+    // Calls for the count rule: bridge short gaps, drop blips (cf. segment_calls)
+    const t = fr => (fr * hop + N / 2) / cfg.sr, calls = [];
+    for (const [a, b] of runs) {{
+      const last = calls[calls.length - 1];
+      if (last && (a - last[1]) * spf < cfg.min_gap) last[1] = b;
+      else calls.push([a, b]);
+    }}
+    return {{ vec, calls: calls.filter(([a, b]) => (b - a) * spf >= cfg.min_call).map(([a, b]) => [t(a), t(b - 1)]) }};
+  }}
+
+  // Standardise, int8 dense layers (ReLU between), softmax
+  function classify(vec) {{
+    let h = new Float32Array(vec.length);
+    for (let i = 0; i < vec.length; i++) h[i] = (vec[i] - model.mu[i]) / model.sd[i];
+    layers.forEach((L, li) => {{
+      const o = new Float32Array(L.nOut);
+      for (let r = 0; r < L.nOut; r++) {{
+        let s = 0;
+        for (let c = 0, j = r * L.nIn; c < L.nIn; c++, j++) s += L.w[j] * h[c];
+        s = s * L.scale + L.b[r];
+        o[r] = li < layers.length - 1 ? Math.max(0, s) : s;
+      }}
+      h = o;
+    }});
+    const mx = Math.max(...h), ex = h.map(v => Math.exp(v - mx)), sum = ex.reduce((s, v) => s + v, 0);
+    return Array.from(ex, v => v / sum);
+  }}
+
+  self.onmessage = e => {{
+    const d = e.data;
+    if (d.type === 'init') {{ setup(d.cfg, d.model); return; }}
+    const t0 = performance.now(), {{ vec, calls }} = features(d.samples);
+    self.postMessage({{ id: d.id, calls, probs: layers ? classify(vec) : null, ms: performance.now() - t0 }});
+  }};
+}}
+
+let clsWorker = null, clsSeq = 0;
+const clsWaiting = new Map();
+function getClsWorker() {{
+  if (clsWorker || typeof Worker === 'undefined') return clsWorker;
+  try {{
+    const src = URL.createObjectURL(new Blob(['(' + clsWorkerMain.toString() + ')()'], {{type: 'text/javascript'}}));
+    clsWorker = new Worker(src);
+    clsWorker.onmessage = e => {{
+      const done = clsWaiting.get(e.data.id);
+      if (done) {{ clsWaiting.delete(e.data.id); done(e.data); }}
+    }};
+    clsWorker.postMessage({{type: 'init', cfg: CLS.cfg, model: CLS.model}});
+    clsWorker.postMessage({{type: 'classify', id: 0, samples: new Float32Array(CLS.cfg.sr)}});   // JIT warm-up, result ignored
+  }} catch (e) {{ clsWorker = null; }}
+  return clsWorker;
+}}
+
+// Decode straight to the analysis rate (decodeAudioData resamples to the context rate), mix to mono, classify
+async function classifyBlob(blob) {{
+  const w = getClsWorker();
+  if (!w || typeof OfflineAudioContext === 'undefined') return null;
+  const buf = await new OfflineAudioContext(1, 1, CLS.cfg.sr).decodeAudioData(await blob.arrayBuffer());
+  const x = new Float32Array(buf.length);
+  for (let c = 0; c < buf.numberOfChannels; c++) {{
+    const ch = buf.getChannelData(c);
+    for (let i = 0; i < x.length; i++) x[i] += ch[i] / buf.numberOfChannels;
+  }}
+  const id = ++clsSeq;
+  return new Promise(res => {{ clsWaiting.set(id, res); w.postMessage({{type: 'classify', id, samples: x}}, [x.buffer]); }});
+}}
+
+// Fill the pending card's suggestion line and mark the suggested chip
+async function suggestPending() {{
+  const blob = pendingBlob;
+  let r = null;
+  try {{ r = await classifyBlob(blob); }} catch (e) {{ r = null; }}   // undecodable container / no Web Audio
+  const box = document.getElementById('pendingSuggest');
+  if (!r || !box || blob !== pendingBlob) return;
+  let cat = '', text = '';
+  if (r.probs) {{
+    const ranked = CLS.model.classes.map((c, i) => [c, r.probs[i]]).sort((a, b) => b[1] - a[1]);
+    cat = ranked[0][0];
+    text = '🤖 ' + ranked.slice(0, 2).filter(([, p]) => p >= 0.1)
+      .map(([c, p]) => `${{CATEGORIES.find(x => x.id === c)?.label || c}} ${{Math.round(p * 100)}}%`).join(' · ');
+  }} else {{
+    const sug = suggestCategory(r.calls);
+    if (!sug) return;
+    cat = sug.cat;
+    text = `Suggested: ${{CATEGORIES.find(x => x.id === cat).label}} — ${{sug.why}}`;
+  }}
+  box.textContent = text;
+  document.querySelectorAll('#pendingChips .player-chip').forEach(c => c.classList.toggle('suggested', c.dataset.cat === cat));
+}}
+
 const CROW_RESPONSES = [
   {{id:'approached', label:'🐦 Approached'}},
   {{id:'answered',   label:'🔊 Responded'}},
@@ -2547,6 +4232,7 @@ function showPending() {{
     </div>
     <div style="font-size:11px;color:var(--t3);text-transform:uppercase;letter-spacing:0.5px;margin-bottom:4px">Sound category</div>
     <div style="display:flex;flex-wrap:wrap;gap:7px;margin-bottom:12px" id="pendingChips">${{chips}}</div>
+    <div class="player-suggest" id="pendingSuggest"></div>
     <input class="form-input" id="pendingPhonetic" type="text" placeholder="🔤 Phonetic: e.g. kra-kra-kraa…" style="width:100%;margin-bottom:8px;font-family:monospace">
     <input class="form-input" id="pendingTolkning" type="text" placeholder="💡 Meaning: e.g. Contact, slightly anxious…" style="width:100%;margin-bottom:8px">
     <input class="form-input" id="pendingPlace" type="text" placeholder="📍 Location (e.g. Södermalm, Stockholm)…" style="width:100%;margin-bottom:12px">
@@ -2566,6 +4252,7 @@ function showPending() {{
     }};
     pendingAudio.onended=()=>{{const i=document.getElementById('ppIcon');if(i)i.innerHTML='<path d="M8 5v14l11-7z"/>';}};
   }}
+  suggestPending();
 }}
 function selectPendingChip(btn) {{
   document.querySelectorAll('#pendingChips .player-chip').forEach(c=>c.classList.remove('selected'));
@@ -2603,7 +4290,8 @@ async function savePending() {{
     gps: pendingGPS,
     recTime: pendingRecStart?.toISOString()||null,
     ts: Date.now(),
-    duration: pendingAudio?.duration||0
+    duration: pendingAudio?.duration||0,
+    calls: liveCalls.flat().map(t=>Math.round(t*100))   // live detector, [on, off, …] cs like RECORDINGS[].calls
   }});
   discardPending(); renderField(); loadFieldItems();
 }}
@@ -2614,42 +4302,46 @@ async function renderField() {{
       '<div class="empty-state">Storage not available in this browser context</div>';
     return;
   }}
-  const recs=await dbGetAll('recordings');
+  const recs=await dbAll('recordings');
   const list=document.getElementById('fieldList');
   document.getElementById('fieldCount').textContent=recs.length?recs.length+' saved':'';
   if(!recs.length){{list.innerHTML='<div class="empty-state">No recordings yet</div>';return;}}
-  list.innerHTML=[...recs].reverse().map(r=>{{
+  renderKeyed(list, [...recs].reverse(), r=>String(r.id), r=>{{
     const cat      = CATEGORIES.find(c=>c.id===r.category)?.label||'';
     const resp     = CROW_RESPONSES.find(x=>x.id===r.response)?.label||'';
     const date     = new Date(r.ts).toLocaleDateString('sv-SE',{{month:'short',day:'numeric',hour:'2-digit',minute:'2-digit'}});
     const gpsStr   = r.gps ? `${{r.gps.lat}}, ${{r.gps.lon}}` : '';
     const placeStr = r.place || '';
-    return `<div class="field-card" id="fc-${{r.id}}">
+    return `<div class="field-card" id="fc-${{r.id}}" data-key="${{r.id}}">
       <div class="field-head">
-        <button class="field-play" onclick="toggleField('${{r.id}}')">
+        <button class="field-play" data-act="play">
           <svg id="fpi-${{r.id}}" viewBox="0 0 24 24" fill="currentColor"><path d="M8 5v14l11-7z"/></svg>
         </button>
         <div class="field-info">
           <div class="field-id">🕐 ${{date}}${{placeStr?' · 📍'+placeStr:''}}</div>
-          <div class="field-label-txt ${{cat?'':'empty'}}">${{cat||'Unlabelled'}}${{resp?' · '+resp:''}}</div>
+          <div class="field-label-txt ${{cat?'':'empty'}}">${{cat||'Unlabelled'}}${{resp?' · '+resp:''}}${{r.replies!=null?` · ↩ ${{r.replies}}${{r.latency!=null?' after '+Math.round(r.latency*1000)+' ms':''}}`:''}}</div>
           ${{r.phonetic?`<div style="font-size:12px;color:var(--green);font-family:monospace;margin-top:2px">${{r.phonetic}}</div>`:''}}
           ${{r.tolkning?`<div style="font-size:11px;color:var(--blue);margin-top:1px">💡 ${{r.tolkning}}</div>`:''}}
           ${{gpsStr?`<div style="font-size:10px;color:var(--t3);margin-top:1px">📍 ${{gpsStr}} (±${{r.gps.acc}}m)</div>`:''}}
           ${{r.notes?`<div style="font-size:11px;color:var(--t3);margin-top:1px">${{r.notes}}</div>`:''}}
         </div>
-        <button class="field-del" onclick="deleteField(${{r.id}})">×</button>
+        <button class="field-del" data-act="del">×</button>
       </div>
       <div class="field-prog">
         <div class="field-prog-track"><div class="field-prog-fill" id="fpf-${{r.id}}"></div></div>
-        <div class="field-prog-time" id="fpt-${{r.id}}">${{fmt(r.duration||0)}}</div>
+        <div class="field-prog-time" id="fpt-${{r.id}}">${{r.calls?.length?r.calls.length/2+'× · ':''}}${{fmt(r.duration||0)}}</div>
       </div>
     </div>`;
-  }}).join('');
+  }});
 }}
+onListAction(document.getElementById('fieldList'), {{
+  play: id => toggleField(Number(id)),
+  del:  id => deleteField(Number(id)),
+}});
 async function toggleField(id) {{
   if(fieldPlaying===id){{stopField();return;}}
   stopField();
-  const all=await dbGetAll('recordings'); const rec=all.find(r=>r.id===id);
+  const rec=(await dbAll('recordings')).find(r=>r.id===id);
   if(!rec?.blob)return;
   if(fieldURL)URL.revokeObjectURL(fieldURL);
   fieldURL=URL.createObjectURL(rec.blob);
@@ -2657,15 +4349,17 @@ async function toggleField(id) {{
   fieldPlaying=id;
   document.getElementById('fc-'+id)?.classList.add('playing');
   document.getElementById('fpi-'+id).innerHTML='<rect x="6" y="4" width="4" height="16"/><rect x="14" y="4" width="4" height="16"/>';
-  fieldTimerInt=setInterval(()=>{{
+  let fill=null, time=null, shown='';
+  animStart('field', ()=>{{
     if(!fieldAudio.duration)return;
-    const pct=(fieldAudio.currentTime/fieldAudio.duration)*100;
-    const fill=document.getElementById('fpf-'+id), time=document.getElementById('fpt-'+id);
-    if(fill)fill.style.width=pct+'%'; if(time)time.textContent=fmt(fieldAudio.currentTime);
-  }},100);
+    if(!fill?.isConnected){{fill=document.getElementById('fpf-'+id); time=document.getElementById('fpt-'+id); shown='';}}   // list re-rendered
+    if(fill)fill.style.transform=`scaleX(${{fieldAudio.currentTime/fieldAudio.duration}})`;
+    const t=fmt(fieldAudio.currentTime);
+    if(time&&t!==shown){{shown=t; time.textContent=t;}}
+  }});
 }}
 function stopField() {{
-  clearInterval(fieldTimerInt); fieldTimerInt=null;
+  animStop('field');
   if(fieldPlaying){{
     document.getElementById('fc-'+fieldPlaying)?.classList.remove('playing');
     const icon=document.getElementById('fpi-'+fieldPlaying);
@@ -2770,34 +4464,35 @@ async function renderDagbok() {{
       '<div class="empty-state">Storage not available in this browser context</div>';
     return;
   }}
-  const entries = await dbGetAll('dagbok');
+  const entries = await dbAll('dagbok');
   const list = document.getElementById('dagbokList');
   document.getElementById('dagbokCount').textContent = entries.length ? entries.length + ' entries' : '';
   if (!entries.length) {{
     list.innerHTML = '<div class="empty-state" style="padding:32px 16px">No entries yet</div>';
     return;
   }}
-  list.innerHTML = [...entries].reverse().map(e => {{
+  renderKeyed(list, [...entries].reverse(), e => String(e.id), e => {{
     const dateStr = e.date
       ? new Date(e.date + 'T12:00:00').toLocaleDateString('sv-SE', {{weekday:'short',month:'short',day:'numeric'}})
       : new Date(e.ts).toLocaleDateString('sv-SE', {{month:'short',day:'numeric'}});
     const acts = (e.activities||[]).map(a =>
       `<span class="journal-activity-tag">${{a}}</span>`
     ).join('');
-    return `<div class="journal-entry" id="je-${{e.id}}">
+    return `<div class="journal-entry" id="je-${{e.id}}" data-key="${{e.id}}">
       <div class="journal-head">
         <div>
           <div class="journal-date">${{dateStr}}</div>
           <div class="journal-loc">${{e.place || '<em style="color:var(--t3)">No location given</em>'}}</div>
           <div class="journal-weather">${{e.weather||''}}</div>
         </div>
-        <button class="journal-del" onclick="deleteDagbok(${{e.id}})">×</button>
+        <button class="journal-del" data-act="del">×</button>
       </div>
       ${{acts ? `<div class="journal-activities">${{acts}}</div>` : ''}}
       ${{e.notes ? `<div class="journal-notes">${{e.notes}}</div>` : ''}}
     </div>`;
-  }}).join('');
+  }});
 }}
+onListAction(document.getElementById('dagbokList'), {{ del: id => deleteDagbok(Number(id)) }});
 
 async function deleteDagbok(id) {{
   await dbDelete('dagbok', id);
@@ -2807,9 +4502,103 @@ async function deleteDagbok(id) {{
 // ═══════════════════════════════════════════════════════════════════
 // DATA TAB
 // ═══════════════════════════════════════════════════════════════════
+// ── Dialect map (DIALECT grid from dialect_grid.py, drawn offline) ───
+const DIALECT_LABELS = {{f0: ['Pitch', 'kHz'], len: ['Call length', 's'], ici: ['Call interval', 's'], n: ['Calls', '']}};
+const DIALECT_RAMP   = [[13,37,53], [45,212,191], [62,207,114], [240,168,50]];   // low → high, as the spectrograms
+let dialectFeat = 0, dialectGeo = null;
+
+function dialectCard() {{
+  if (!DIALECT || !DIALECT.cells.length) return '';
+  return `<div class="stat-card">
+    <div class="stat-title">Dialect map · ${{DIALECT.n}} recordings · ${{DIALECT.cell}}° squares</div>
+    <div class="dialect-chips">${{DIALECT.features.map((f, j) =>
+      `<button class="filter-chip ${{j === dialectFeat ? 'on' : ''}}" onclick="setDialectFeat(${{j}})">${{DIALECT_LABELS[f]?.[0] || f}}</button>`).join('')}}</div>
+    <canvas id="dialectMap" class="dialect-map"></canvas>
+    <div class="dialect-info" id="dialectInfo">Tap a square for its numbers</div>
+  </div>`;
+}}
+
+function setDialectFeat(j) {{
+  dialectFeat = j;
+  document.querySelectorAll('.dialect-chips .filter-chip').forEach((b, i) => b.classList.toggle('on', i === j));
+  drawDialectMap();
+}}
+
+function rampColor(f) {{
+  const x = Math.min(1, Math.max(0, f)) * (DIALECT_RAMP.length - 1), i = Math.min(DIALECT_RAMP.length - 2, Math.floor(x));
+  return DIALECT_RAMP[i].map((v, k) => Math.round(v + (DIALECT_RAMP[i + 1][k] - v) * (x - i)));
+}}
+
+// Equirectangular projection of the cells' bounding box, true aspect at its mid-latitude
+function drawDialectMap() {{
+  const cv = document.getElementById('dialectMap');
+  if (!cv || !DIALECT) return;
+  const d = DIALECT.cell, cells = DIALECT.cells, col = 3 + dialectFeat * 4;
+  let y0 = Infinity, y1 = -Infinity, x0 = Infinity, x1 = -Infinity, maxN = 1;
+  for (const c of cells) {{
+    y0 = Math.min(y0, c[0]); y1 = Math.max(y1, c[0] + 1); x0 = Math.min(x0, c[1]); x1 = Math.max(x1, c[1] + 1);
+    maxN = Math.max(maxN, c[2]);
+  }}
+  y0--; x0--; y1++; x1++;
+  const kx = Math.cos((y0 + y1) / 2 * d * Math.PI / 180);
+  const W = cv.clientWidth || 320, H = Math.round(Math.min(360, Math.max(160, W * (y1 - y0) / ((x1 - x0) * kx))));
+  const dpr = window.devicePixelRatio || 1;
+  cv.width = W * dpr; cv.height = H * dpr; cv.style.height = H + 'px';
+  const g = cv.getContext('2d');
+  g.setTransform(dpr, 0, 0, dpr, 0, 0);
+  const s = Math.min(W / ((x1 - x0) * kx), H / (y1 - y0));
+  const ox = (W - (x1 - x0) * kx * s) / 2, oy = (H - (y1 - y0) * s) / 2;
+  const X = lon => ox + (lon / d - x0) * kx * s, Y = lat => oy + (y1 - lat / d) * s;
+  dialectGeo = {{d, kx, s, ox, oy, x0, y1}};
+
+  g.fillStyle = '#07090a'; g.fillRect(0, 0, W, H);
+  // Graticule at a round step, about five lines across
+  const step = [0.1, 0.25, 0.5, 1, 2, 5, 10, 20].find(v => v >= (x1 - x0) * d / 5) || 30;
+  g.strokeStyle = '#1d262e'; g.fillStyle = '#556070'; g.font = '9px monospace'; g.lineWidth = 1;
+  for (let lon = Math.ceil(x0 * d / step) * step; lon <= x1 * d; lon += step) {{
+    g.beginPath(); g.moveTo(X(lon), 0); g.lineTo(X(lon), H); g.stroke();
+    g.fillText(+lon.toFixed(2) + '°', X(lon) + 2, H - 3);
+  }}
+  for (let lat = Math.ceil(y0 * d / step) * step; lat <= y1 * d; lat += step) {{
+    g.beginPath(); g.moveTo(0, Y(lat)); g.lineTo(W, Y(lat)); g.stroke();
+    g.fillText(+lat.toFixed(2) + '°', 2, Y(lat) - 2);
+  }}
+
+  const vals = cells.map(c => c[col]).filter(v => v !== null);
+  const lo = Math.min(...vals), hi = Math.max(...vals);
+  for (const c of cells) {{
+    if (c[col] === null) continue;
+    const [r, gr, b] = rampColor(hi > lo ? (c[col] - lo) / (hi - lo) : 0.5);
+    g.fillStyle = `rgba(${{r}},${{gr}},${{b}},${{(0.35 + 0.65 * Math.log1p(c[2]) / Math.log1p(maxN)).toFixed(2)}})`;
+    g.fillRect(X(c[1] * d), Y((c[0] + 1) * d), d * kx * s, d * s);
+  }}
+  if (userLat !== null) {{
+    g.fillStyle = '#e8edf0';
+    g.beginPath(); g.arc(X(userLon), Y(userLat), 3, 0, 2 * Math.PI); g.fill();
+  }}
+  const [name, unit] = DIALECT_LABELS[DIALECT.features[dialectFeat]] || [DIALECT.features[dialectFeat], ''];
+  g.fillStyle = '#8fa0ac';
+  g.fillText(`${{name}}: ${{+lo.toFixed(2)}}–${{+hi.toFixed(2)}} ${{unit}}`, W - 4 - g.measureText(`${{name}}: ${{+lo.toFixed(2)}}–${{+hi.toFixed(2)}} ${{unit}}`).width, 11);
+  cv.onclick = showDialectCell;
+}}
+
+function showDialectCell(e) {{
+  if (!dialectGeo) return;
+  const {{d, kx, s, ox, oy, x0, y1}} = dialectGeo, r = e.target.getBoundingClientRect();
+  const ix = Math.floor((e.clientX - r.left - ox) / (kx * s) + x0), iy = Math.floor(y1 - (e.clientY - r.top - oy) / s);
+  const c = DIALECT.cells.find(c => c[0] === iy && c[1] === ix);
+  const info = document.getElementById('dialectInfo');
+  if (!c) {{ info.textContent = 'No recordings in this square'; return; }}
+  info.innerHTML = `${{(iy * d).toFixed(2)}}–${{((iy + 1) * d).toFixed(2)}}°N, ${{(ix * d).toFixed(2)}}–${{((ix + 1) * d).toFixed(2)}}°E · ${{c[2]}} rec.<br>` +
+    DIALECT.features.map((f, j) => {{
+      const [mean, q1, , q3] = c.slice(3 + j * 4, 7 + j * 4), [name, unit] = DIALECT_LABELS[f] || [f, ''];
+      return mean === null ? '' : `${{name}} ${{+mean.toFixed(2)}}${{unit && ' ' + unit}} (IQR ${{+q1.toFixed(2)}}–${{+q3.toFixed(2)}})`;
+    }}).filter(Boolean).join(' · ');
+}}
+
 async function renderData() {{
-  const fieldRecs  = db ? await dbGetAll('recordings') : [];
-  const dagbokRecs = db ? await dbGetAll('dagbok') : [];
+  const fieldRecs  = db ? await dbAll('recordings') : [];
+  const dagbokRecs = db ? await dbAll('dagbok') : [];
   const lbl = getLabels();
   const libLabeled = Object.values(lbl).filter(l=>l.category).length;
   const tally={{}};
@@ -2829,6 +4618,7 @@ async function renderData() {{
       <div class="big-num"><div class="big-num-val">${{dagbokRecs.length}}</div><div class="big-num-label">Journal entries</div></div>
     </div>
     <div class="stat-card"><div class="stat-title">Distribution by category</div>${{bars}}</div>
+    ${{dialectCard()}}
     <div class="stat-card">
       <div class="stat-title">Science background</div>
       <div style="font-size:13px;color:var(--t2);line-height:1.8">
@@ -2840,14 +4630,32 @@ async function renderData() {{
       </div>
     </div>
     <button class="export-btn" onclick="exportData()">⬇ Export all data as JSON</button>`;
+  drawDialectMap();
+}}
+// Blob → bare base64 (no data: prefix) for export bundles
+function blobToB64(blob) {{
+  return new Promise((res,rej) => {{
+    const fr = new FileReader();
+    fr.onload  = () => res(String(fr.result).split(',')[1]||'');
+    fr.onerror = () => rej(fr.error);
+    fr.readAsDataURL(blob);
+  }});
 }}
 async function exportData() {{
   const fieldRecs  = await dbGetAll('recordings');
   const dagbokRecs = await dbGetAll('dagbok');
+  // Each field recording carries its audio so the export doubles as a contribution bundle (bidrag/)
+  const fieldOut = await Promise.all(fieldRecs.map(async r => ( {{
+    id:r.id, category:r.category, phonetic:r.phonetic, tolkning:r.tolkning, response:r.response,
+    place:r.place, gps:r.gps, recTime:r.recTime, notes:r.notes, ts:r.ts, duration:r.duration, calls:r.calls,
+    latency:r.latency, replies:r.replies, session:r.session,
+    mime: r.blob?.type || '', audio: r.blob ? await blobToB64(r.blob) : null
+  }} )));
   const blob=new Blob([JSON.stringify({{
     exportedAt: new Date().toISOString(),
+    build: BUILD,
     libraryLabels: getLabels(),
-    fieldRecordings: fieldRecs.map(r=>( {{id:r.id,category:r.category,notes:r.notes,ts:r.ts,duration:r.duration}} )),
+    fieldRecordings: fieldOut,
     dagbok: dagbokRecs.map(e=>( {{id:e.id,date:e.date,place:e.place,weather:e.weather,activities:e.activities,notes:e.notes,ts:e.ts}} )),
   }},null,2)],{{type:'application/json'}});
   const a=document.createElement('a'); a.href=URL.createObjectURL(blob);
@@ -2862,6 +4670,140 @@ function fmt(s) {{
   return Math.floor(s/60)+':'+String(Math.floor(s%60)).padStart(2,'0');
 }}
 
+// Recording names, places and labels come from contributors – escape before innerHTML
+function escHtml(s) {{
+  return String(s).replace(/[&<>"']/g, c => ({{'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}})[c]);
+}}
+
+// ═══════════════════════════════════════════════════════════════════
+// PERF  (hidden: tap OFFLINE five times, or open the app with #perf)
+// ═══════════════════════════════════════════════════════════════════
+// Hot paths are wrapped in performance.mark/measure (shown in Web Inspector's
+// timeline) and their durations kept per span. The overlay shows p50/p95 per
+// span, long tasks and JS heap where the browser reports them; "Export trace"
+// saves a Chrome trace-event JSON (chrome://tracing, Perfetto) for bug reports.
+const PERF_KEEP  = 500;    // durations kept per span
+const PERF_TRACE = 5000;   // spans kept for the trace export
+let perfOn = localStorage.getItem('ct_perf') === '1' || location.hash === '#perf';
+const perfSpans = {{}};      // name → [ms, …]
+const perfTrace = [];      // [name, start ms, dur ms]
+const perfLong  = [];      // [start ms, dur ms]
+let perfSeq = 0, perfObs = null;
+
+function perfSpan(name, fn) {{
+  return function(...args) {{
+    if (!perfOn) return fn.apply(this, args);
+    const mark = `ct:${{name}}#${{++perfSeq}}`, t0 = performance.now();
+    performance.mark(mark);
+    const done = () => perfRecord(name, mark, t0);
+    let out;
+    try {{ out = fn.apply(this, args); }}
+    catch (e) {{ done(); throw e; }}
+    if (out && typeof out.then === 'function') out.then(done, done);   // async: until it settles
+    else done();
+    return out;
+  }};
+}}
+
+function perfRecord(name, mark, t0) {{
+  const dur = performance.now() - t0;
+  try {{ performance.measure('ct:' + name, mark); }} catch (e) {{}}
+  performance.clearMarks(mark);
+  const a = perfSpans[name] || (perfSpans[name] = []);
+  a.push(dur);
+  if (a.length > PERF_KEEP) a.shift();
+  perfTrace.push([name, t0, dur]);
+  if (perfTrace.length > PERF_TRACE) {{ perfTrace.splice(0, PERF_TRACE / 5); performance.clearMeasures(); }}
+}}
+
+function perfStats() {{
+  const out = {{}};
+  for (const [name, a] of Object.entries(perfSpans)) {{
+    const s = [...a].sort((x, y) => x - y), q = p => +s[Math.min(s.length - 1, Math.floor(p * s.length))].toFixed(1);
+    out[name] = {{n: s.length, p50: q(0.5), p95: q(0.95), max: +s[s.length - 1].toFixed(1)}};
+  }}
+  return out;
+}}
+
+function perfHeap() {{
+  const m = performance.memory;   // Chromium only
+  return m ? {{used: m.usedJSHeapSize, total: m.totalJSHeapSize, limit: m.jsHeapSizeLimit}} : null;
+}}
+
+function perfShow(on) {{
+  perfOn = on;
+  localStorage.setItem('ct_perf', on ? '1' : '0');
+  let el = document.getElementById('perfOverlay');
+  if (!on) {{ el?.remove(); return; }}
+  if (el) return;
+  el = document.createElement('div');
+  el.id = 'perfOverlay';
+  el.className = 'perf-overlay';
+  el.innerHTML = `<div id="perfStats"></div>
+    <div class="perf-btns"><button data-perf="export">Export trace</button><button data-perf="reset">Reset</button><button data-perf="close">×</button></div>`;
+  el.addEventListener('click', e => {{
+    const act = e.target.dataset?.perf;
+    if (act === 'export') perfExport();
+    if (act === 'reset') {{ for (const k in perfSpans) delete perfSpans[k]; perfTrace.length = perfLong.length = 0; performance.clearMeasures(); }}
+    if (act === 'close') perfShow(false);
+  }});
+  document.body.appendChild(el);
+  if (!perfObs && window.PerformanceObserver && PerformanceObserver.supportedEntryTypes?.includes('longtask')) {{
+    perfObs = new PerformanceObserver(list => {{
+      for (const e of list.getEntries()) perfLong.push([e.startTime, e.duration]);
+      if (perfLong.length > PERF_KEEP) perfLong.splice(0, perfLong.length - PERF_KEEP);
+    }});
+    perfObs.observe({{type: 'longtask', buffered: true}});
+  }}
+  perfTick();
+}}
+
+function perfTick() {{
+  const el = document.getElementById('perfStats');
+  if (!el) return;
+  const rows = Object.entries(perfStats()).map(([name, s]) =>
+    `<tr><td>${{name}}</td><td>${{s.n}}</td><td>${{s.p50}}</td><td>${{s.p95}}</td></tr>`).join('');
+  const now = performance.now(), recent = perfLong.filter(([t]) => now - t < 60000);
+  const heap = perfHeap();
+  el.innerHTML = `<table><tr><th>span</th><th>n</th><th>p50</th><th>p95 ms</th></tr>${{rows}}</table>
+    <div>long tasks: ${{perfObs ? `${{perfLong.length}} (${{recent.length}} last min, max ${{Math.round(Math.max(0, ...perfLong.map(l => l[1])))}} ms)` : 'n/a'}}</div>
+    <div>heap: ${{heap ? (heap.used / 1048576).toFixed(1) + ' / ' + (heap.limit / 1048576).toFixed(0) + ' MB' : 'n/a'}}</div>`;
+  setTimeout(perfTick, 1000);
+}}
+
+function perfExport() {{
+  const ev = (name, cat, tid) => ([t, d]) => ({{name, cat, ph: 'X', pid: 1, tid, ts: Math.round(t * 1000), dur: Math.round(d * 1000)}});
+  const trace = {{
+    traceEvents: [...perfTrace.map(([name, t, d]) => ev(name, 'ct', 1)([t, d])), ...perfLong.map(ev('longtask', 'browser', 2))],
+    displayTimeUnit: 'ms',
+    metadata: {{exportedAt: new Date().toISOString(), build: BUILD, userAgent: navigator.userAgent, timeOrigin: performance.timeOrigin,
+               stats: perfStats(), heap: perfHeap(), recordings: RECORDINGS.length, fieldItems: fieldItems.length}},
+  }};
+  const a = document.createElement('a');
+  a.href = URL.createObjectURL(new Blob([JSON.stringify(trace)], {{type: 'application/json'}}));
+  a.download = 'crowtalk_trace.json'; a.click();
+}}
+
+(function() {{
+  let taps = [];
+  document.querySelector('.offline-badge')?.addEventListener('click', () => {{
+    const t = Date.now();
+    taps = taps.filter(x => t - x < 3000).concat(t);
+    if (taps.length >= 5) {{ taps = []; perfShow(!document.getElementById('perfOverlay')); }}
+  }});
+}})();
+
+// Wrapped after every declaration so all callers, inline handlers included, go through the span
+openDB          = perfSpan('openDB', openDB);
+dbOp            = perfSpan('dbOp', dbOp);
+loadFieldItems  = perfSpan('loadFieldItems', loadFieldItems);
+buildAllItems   = perfSpan('buildAllItems', buildAllItems);
+renderSoundList = perfSpan('renderSoundList', renderSoundList);
+getBlobUrl      = perfSpan('getBlobUrl', getBlobUrl);
+exportData      = perfSpan('exportData', exportData);
+init            = perfSpan('init', init);
+if (perfOn) perfShow(true);
+
 // ═══════════════════════════════════════════════════════════════════
 // INIT
 // ═══════════════════════════════════════════════════════════════════
@@ -2880,8 +4822,9 @@ async function init() {{
     renderFilterBar();
     renderSoundList();
     initDagbokForm();
+    const nCT = RECORDINGS.filter(r => r.id.startsWith('CT')).length;   // contributions from bidrag/
     document.getElementById('topSub').textContent =
-      `Corvus cornix · ${{RECORDINGS.length}} XC · ${{SYNTH_DEMOS.length}} synthetic`;
+      `Corvus cornix · ${{RECORDINGS.length - nCT}} XC` + (nCT ? ` · ${{nCT}} CT` : '') + ` · ${{SYNTH_DEMOS.length}} synthetic`;
   }} catch(e) {{
     console.error('Render failed:', e);
     const list = document.getElementById('soundList');
@@ -2893,8 +4836,65 @@ init().catch(e => console.error('init rejected:', e));
 </script>
 </body>
 </html>"""
-
-with open(OUTPUT,'w',encoding='utf-8') as f:
-    f.write(html)
-sz = os.path.getsize(OUTPUT)/1024/1024
-print(f"✅ Klar! → {OUTPUT}  ({sz:.1f} MB)")
+        # The hash covers the page with the slot still in it; the slot precedes every
+        # user-supplied string and cannot occur in base64, so the first two are ours
+        build_id = hashlib.sha256(html.encode('utf-8')).hexdigest()[:16]
+        html = html.replace(_BUILD_SLOT, build_id, 2)
+
+    with stage('write'), open(OUTPUT,'w',encoding='utf-8', newline='\n') as f:
+        f.write(html)
+    sz = os.path.getsize(OUTPUT)/1024/1024
+    print(f"✅ Klar! → {OUTPUT}  ({sz:.1f} MB, build {build_id})")
+    _manifest['output'] = [inputs, _stamp(OUTPUT)]
+    save_manifest()
+    if profile:
+        profile_report(profile, time.perf_counter() - w0, time.process_time() - c0)
+        import tracemalloc
+        tracemalloc.stop()
+
+def watch(interval=0.25):
+    """
+    Rebuild whenever an input changes (polls input_stamps(); Ctrl-C stops).
+    An edit of this script reloads it first, so template changes show up too.
+    """
+    import importlib.util, traceback
+    mod, last = sys.modules[__name__], None
+    print("👀 Bevakar ljud/, bidrag/, ikoner, modeller och mallen – Ctrl-C avslutar")
+    while True:
+        now = mod.input_stamps()
+        if now != last:
+            changed = [os.path.relpath(p, _HERE) for p in sorted(set(now) | set(last or {})) if now.get(p) != (last or {}).get(p)]
+            t0 = time.perf_counter()
+            try:
+                script = os.path.abspath(__file__)
+                if last and now.get(script) != last.get(script):
+                    spec = importlib.util.spec_from_file_location('build_crowtalk', script)
+                    new = importlib.util.module_from_spec(spec)
+                    spec.loader.exec_module(new)
+                    new._memo = mod._memo   # keyed by content + processing parameters: still valid
+                    mod = new
+                mod.build()
+            except SystemExit:
+                pass   # asset budget exceeded – already reported
+            except Exception:
+                traceback.print_exc()
+            if last:
+                print(f"⟳ {(time.perf_counter() - t0) * 1000:.0f} ms  ({', '.join(changed[:3])}{' …' if len(changed) > 3 else ''})")
+            last = now
+        time.sleep(interval)
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    ap.add_argument('--profile', nargs='?', const=PROFILE_FILE, metavar='REPORT',
+                    help='time every stage per file (wall, CPU, peak memory) and write a JSON report '
+                         f'(default {os.path.basename(PROFILE_FILE)}); tracemalloc adds overhead to the timings')
+    ap.add_argument('--no-cache', action='store_true', help='reprocess every recording instead of using .cache/')
+    ap.add_argument('--watch', action='store_true', help='rebuild when ljud/, bidrag/, an icon, a model or this script changes')
+    opt = ap.parse_args()
+    if opt.watch:
+        try:
+            watch()
+        except KeyboardInterrupt:
+            pass
+    else:
+        build(profile=opt.profile, use_cache=not opt.no_cache)
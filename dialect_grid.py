@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Aggregate call acoustics by location into a dialect grid for the app's map layer.
+
+Requirements:
+    pip install numpy scipy matplotlib Pillow soundfile   (same as build_crowtalk.py)
+    ffmpeg on PATH for field recordings made in the app (webm/mp4), as in the build
+
+Usage:
+    python3 dialect_grid.py                       # ljud/ (index.csv / sidecar lat,lon) + bidrag/ (gps)
+    python3 dialect_grid.py export.json --cell 0.25 --jobs 4
+
+Each geotagged recording is segmented with the build's own code and reduced
+to a few call measures (DIALECT_FEATURES). Per-file results are cached by
+mtime/size in .cache/dialect.json, so only new or changed files are decoded.
+The recordings are binned into cell × cell degree squares, and each cell gets
+its count plus the mean and quartiles of every measure. Writes
+dialect_grid.json; then rebuild the app:
+    python3 build_crowtalk.py
+"""
+
+import sys, os, json, argparse, zipfile
+from concurrent.futures import ProcessPoolExecutor
+sys.stdout.reconfigure(encoding='utf-8')
+import numpy as np
+
+from build_crowtalk import (AUDIO_DIR, CONTRIB_DIR, CACHE_DIR, DIALECT_FILE, DIALECT_FORMAT, DIALECT_FEATURES,
+                            decode_audio, to_analysis_rate, stft_power, segment_calls, frame_times,
+                            load_metadata, listdir_sorted, _read_bundle, FFMPEG)
+
+CACHE_FILE  = os.path.join(CACHE_DIR, 'dialect.json')
+_VERSION    = 2        # bump when dialect_measures() changes – invalidates the cache
+UNDECODABLE = 'undecodable'
+
+def dialect_measures(raw):
+    """
+    DIALECT_FEATURES for one recording: dominant frequency (kHz, median over
+    call frames), mean call length (s), mean inter-call interval (s, None for
+    a single call) and call count. None without calls, UNDECODABLE if the
+    audio can't be read (the app's webm/mp4 exports need ffmpeg).
+    """
+    dec = decode_audio(raw)
+    if dec is None:
+        return UNDECODABLE
+    f, power = stft_power(to_analysis_rate(dec['data'], dec['sr']))
+    calls = segment_calls(f, power)
+    if not len(calls):
+        return None
+    t = frame_times(len(power))
+    active = ((t[:, None] >= calls[:, 0]) & (t[:, None] <= calls[:, 1])).any(axis=1)
+    band = (f >= 300) & (f <= 8000)
+    dom = f[band][np.argmax(power[active][:, band], axis=1)] / 1000
+    ici = np.diff(calls[:, 0])
+    return [round(float(np.median(dom)), 3), round(float((calls[:, 1] - calls[:, 0]).mean()), 3),
+            round(float(ici.mean()), 3) if ici.size else None, len(calls)]
+
+def _stamp(path):
+    st = os.stat(path)
+    return [_VERSION, FFMPEG is not None, st.st_mtime_ns, st.st_size]
+
+def _bundle_rows(path):
+    """[(lat, lon, raw bytes)] for the geotagged field recordings in an export bundle."""
+    rows = []
+    with _read_bundle(path) as (data, load):
+        for rec in data.get('fieldRecordings', []):
+            try:
+                lat, lon = float(rec['gps']['lat']), float(rec['gps']['lon'])
+                raw = load(rec)
+            except (KeyError, TypeError, ValueError, zipfile.BadZipFile):
+                continue
+            if raw and -90 <= lat <= 90 and -180 <= lon <= 180:
+                rows.append((lat, lon, raw))
+    return rows
+
+def _measure_file(path):
+    with open(path, 'rb') as f:
+        return dialect_measures(f.read())
+
+def collect(bundle_paths, jobs):
+    """Return (lat, lon, V[n, len(DIALECT_FEATURES)]) with NaN for missing values, updating the cache."""
+    try:
+        with open(CACHE_FILE, encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    meta = load_metadata()
+
+    files = []   # (key, path, lat, lon) – ljud/ recordings with coordinates
+    for fname in listdir_sorted(AUDIO_DIR):
+        m = meta.get(fname.split(' ')[0], {})
+        if (fname.endswith('.wav') or fname.endswith('.mp3')) and m.get('lat') is not None and m.get('lon') is not None:
+            files.append(('ljud/' + fname, os.path.join(AUDIO_DIR, fname), m['lat'], m['lon']))
+    fresh = {}
+    stale_files = [(k, p) for k, p, _, _ in files if (cache.get(k) or {}).get('stamp') != _stamp(p)]
+    stale_bundles = [p for p in bundle_paths if (cache.get(p) or {}).get('stamp') != _stamp(p)]
+    if stale_files or stale_bundles:
+        print(f"  {len(stale_files)} ljudfiler + {len(stale_bundles)} bidrag att analysera")
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for (k, p), v in zip(stale_files, pool.map(_measure_file, [p for _, p in stale_files], chunksize=8)):
+            cache[k] = {'stamp': _stamp(p), 'v': v}
+        for p in stale_bundles:   # one bundle's audio in memory at a time, its recordings spread over the pool
+            try:
+                rows = _bundle_rows(p)
+            except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+                print(f"  ⚠ skip bundle {os.path.basename(p)} ({e})")
+                continue
+            vs = pool.map(dialect_measures, [raw for _, _, raw in rows])
+            cache[p] = {'stamp': _stamp(p), 'rows': [[la, lo, v] for (la, lo, _), v in zip(rows, vs)]}
+
+    lat, lon, vals, undecodable = [], [], [], 0
+    def add(la, lo, v):
+        nonlocal undecodable
+        if v == UNDECODABLE:
+            undecodable += 1
+        elif v:
+            lat.append(la); lon.append(lo); vals.append(v)
+    for k, _, la, lo in files:
+        fresh[k] = cache[k]
+        add(la, lo, cache[k]['v'])
+    for p in bundle_paths:
+        if p in cache:
+            fresh[p] = cache[p]
+            for la, lo, v in cache[p]['rows']:
+                add(la, lo, v)
+    if undecodable:
+        print(f"  ⚠ {undecodable} geotaggade inspelningar kunde inte avkodas och ingår inte"
+              f"{'' if FFMPEG else ' (appens webm/mp4 kräver ffmpeg)'}")
+    if fresh != cache or stale_files or stale_bundles:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(fresh, f, separators=(',', ':'))
+    V = np.array([[np.nan if x is None else x for x in v] for v in vals], np.float64).reshape(-1, len(DIALECT_FEATURES))
+    return np.array(lat, np.float64), np.array(lon, np.float64), V
+
+def grid(lat, lon, V, cell):
+    """
+    Bin into cell-degree squares. Returns (iy, ix, count, stats) where stats is
+    [n_cells, n_features, 4] = mean, p25, p50, p75 (NaN where a cell has no value).
+    """
+    keys, inv, count = np.unique(np.stack([np.floor(lat / cell), np.floor(lon / cell)], axis=1).astype(np.int64),
+                                 axis=0, return_inverse=True, return_counts=True)
+    inv = inv.ravel()
+    K, F = len(keys), V.shape[1]
+    stats = np.full((K, F, 4), np.nan)
+    for j in range(F):
+        ok = ~np.isnan(V[:, j])
+        g, v = inv[ok], V[ok, j]
+        n = np.bincount(g, minlength=K)
+        has = n > 0
+        stats[has, j, 0] = np.bincount(g, v, minlength=K)[has] / n[has]
+        # Quartiles per cell: sort by (cell, value), then index into each cell's run
+        sv = v[np.lexsort((v, g))]
+        start = np.concatenate(([0], np.cumsum(n)[:-1]))[has]
+        for col, q in ((1, 0.25), (2, 0.5), (3, 0.75)):
+            pos = start + q * (n[has] - 1)          # linear interpolation, as np.percentile
+            lo = np.floor(pos).astype(int)
+            hi = np.minimum(lo + 1, start + n[has] - 1)
+            stats[has, j, col] = sv[lo] + (sv[hi] - sv[lo]) * (pos - lo)
+    return keys[:, 0], keys[:, 1], count, stats
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    ap.add_argument('bundles', nargs='*', help='extra app exports (.json / .zip); bidrag/ is always read')
+    ap.add_argument('--cell', type=float, default=0.5, help='cell size in degrees (default 0.5)')
+    ap.add_argument('--jobs', type=int, default=os.cpu_count())
+    ap.add_argument('--out', default=DIALECT_FILE)
+    opt = ap.parse_args()
+
+    bundles = [os.path.join(CONTRIB_DIR, n) for n in listdir_sorted(CONTRIB_DIR)
+               if n.endswith('.json') or n.endswith('.zip')] if os.path.isdir(CONTRIB_DIR) else []
+    print("🗺  Samlar geotaggade inspelningar...")
+    lat, lon, V = collect(bundles + [os.path.abspath(p) for p in opt.bundles], opt.jobs)
+    if not len(lat):
+        print("❌ No geotagged recordings with detectable calls.")
+        sys.exit(1)
+
+    iy, ix, count, stats = grid(lat, lon, V, opt.cell)
+    r = lambda a: [None if np.isnan(x) else round(float(x), 3) for x in a]
+    out = {
+        'format': DIALECT_FORMAT, 'cell': opt.cell, 'features': list(DIALECT_FEATURES), 'n': int(len(lat)),
+        # one row per cell: iy, ix, count, then per feature mean, p25, p50, p75
+        'cells': [[int(iy[k]), int(ix[k]), int(count[k]), *r(stats[k].ravel())] for k in range(len(count))],
+    }
+    with open(opt.out, 'w', encoding='utf-8') as f:
+        json.dump(out, f, separators=(',', ':'))
+    print(f"✅ {os.path.basename(opt.out)}: {len(lat)} inspelningar i {len(count)} rutor à {opt.cell}°"
+          f"  ({os.path.getsize(opt.out)//1024} KB) – kör python3 build_crowtalk.py")
+
+if __name__ == '__main__':
+    main()
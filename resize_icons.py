@@ -3,10 +3,11 @@
 Generate all icon sizes from logo.png.
 
 Requirements:
-    pip install Pillow
+    pip install Pillow numpy scipy
 
 Usage:
-    python3 resize_icons.py
+    python3 resize_icons.py            # only regenerates outputs whose inputs changed
+    python3 resize_icons.py --force    # regenerate everything
 
 Input:  logo.png  (place in project root, transparent background, ideally 1024×1024)
 Output: icon-32.png      – Favicon
@@ -19,8 +20,10 @@ Then rebuild the app:
     python3 build_crowtalk.py
 """
 
-import sys, os
+import sys, os, json, hashlib
+from concurrent.futures import ThreadPoolExecutor
 sys.stdout.reconfigure(encoding='utf-8')
+import numpy as np
 from PIL import Image, ImageDraw
 
 SRC = os.path.join(os.path.dirname(__file__), "logo.png")
@@ -32,47 +35,65 @@ if not os.path.exists(SRC):
 def remove_checkerboard_bg(img, threshold=40):
     """
     Remove the baked-in checkered background from an image.
-    Detects background by flood-filling from all four corners,
-    then makes those pixels transparent.
+    Background = pixels within `threshold` (per channel) of a corner colour
+    that are 4-connected to one of the corners; those become transparent.
+    Vectorised: colour-distance mask + connected-component labelling.
     """
-    img = img.convert("RGBA")
-    w, h = img.size
-    pixels = img.load()
-
-    def similar(p1, p2, t):
-        return all(abs(int(p1[i]) - int(p2[i])) <= t for i in range(3))
-
-    # Collect seed background colors from corners
-    corner_colors = [pixels[0,0], pixels[w-1,0], pixels[0,h-1], pixels[w-1,h-1]]
-
-    # Mark background pixels using flood fill from edges
-    from collections import deque
-    visited = [[False]*h for _ in range(w)]
-    queue = deque()
-    seeds = [(0,0),(w-1,0),(0,h-1),(w-1,h-1)]
-    for sx, sy in seeds:
-        if not visited[sx][sy]:
-            queue.append((sx, sy))
-            visited[sx][sy] = True
-
-    bg_color = pixels[0, 0]  # representative background color
-
-    while queue:
-        x, y = queue.popleft()
-        p = pixels[x, y]
-        if not similar(p, bg_color, threshold):
-            # Try other corner colors
-            if not any(similar(p, c, threshold) for c in corner_colors):
-                continue
-        # Mark as background
-        pixels[x, y] = (p[0], p[1], p[2], 0)
-        for dx, dy in [(-1,0),(1,0),(0,-1),(0,1)]:
-            nx, ny = x+dx, y+dy
-            if 0 <= nx < w and 0 <= ny < h and not visited[nx][ny]:
-                visited[nx][ny] = True
-                queue.append((nx, ny))
-
-    return img
+    from scipy import ndimage   # slow import – only needed when a rebuild is due
+    a = np.array(img.convert("RGBA"))
+    h, w = a.shape[:2]
+    rows, cols = [0, 0, h-1, h-1], [0, w-1, 0, w-1]
+    chans = [a[..., k].astype(np.int16) for k in range(3)]
+
+    # Pixels close to any (distinct) corner colour, one 2-D channel at a time
+    mask = np.zeros((h, w), dtype=bool)
+    for c in {tuple(int(ch[r, q]) for ch in chans) for r, q in zip(rows, cols)}:
+        m = np.abs(chans[0] - c[0]) <= threshold
+        for k in (1, 2):
+            m &= np.abs(chans[k] - c[k]) <= threshold
+        mask |= m
+
+    # Default structure is the 4-neighbour cross, same as the old flood fill
+    labels, n = ndimage.label(mask)
+    is_bg = np.zeros(n + 1, dtype=bool)
+    is_bg[labels[rows, cols]] = True
+    is_bg[0] = False
+    a[is_bg[labels], 3] = 0
+    return Image.fromarray(a, "RGBA")
+
+# --- Change detection: skip outputs whose source hash + parameters are unchanged ---
+HERE       = os.path.dirname(os.path.abspath(__file__))
+STAMPS     = os.path.join(HERE, ".cache", "icons.json")
+PIPELINE   = 2            # bump when the rendering below changes
+BG_RGB     = (7, 9, 10)   # --bg color
+FORCE      = "--force" in sys.argv
+
+with open(SRC, "rb") as f:
+    src_hash = hashlib.sha1(f.read()).hexdigest()
+
+# (filename, kind, size) – size is the square edge, or None for the social card
+JOBS = [
+    ("icon-32.png",  "square", 32),
+    ("icon-180.png", "square", 180),
+    ("icon-192.png", "square", 192),
+    ("icon-512.png", "square", 512),
+    ("social.png",   "social", None),
+]
+
+def job_key(job):
+    return hashlib.sha1(f"{src_hash}|{PIPELINE}|{job!r}|{BG_RGB}".encode()).hexdigest()
+
+try:
+    with open(STAMPS, encoding="utf-8") as f:
+        stamps = json.load(f)
+except (OSError, ValueError):
+    stamps = {}
+
+stale = [j for j in JOBS
+         if FORCE or stamps.get(j[0]) != job_key(j) or not os.path.exists(os.path.join(HERE, j[0]))]
+if not stale:
+    print("✓  All icons up to date (logo.png unchanged) – use --force to regenerate")
+    sys.exit(0)
 
 src_raw = Image.open(SRC).convert("RGBA")
 print(f"✓  Loaded logo.png  ({src_raw.width}×{src_raw.height})")
@@ -86,24 +107,36 @@ if corner_alpha == 255:
 else:
     src = src_raw
 
+# Crop to actual content once (removes transparent borders from landscape source)
+bbox = src.getbbox() or (0, 0, src.width, src.height)
+content = src.crop(bbox)
+
+# Resampling pyramid: each halving is taken from the previous level, and every
+# output is resized from the smallest level that is still at least as large.
+pyramid = [content]
+while min(pyramid[-1].size) >= 64:
+    lvl = pyramid[-1]
+    pyramid.append(lvl.resize((max(1, lvl.width // 2), max(1, lvl.height // 2)), Image.LANCZOS))
+
+def scaled_content(w, h):
+    """Content resized to (w, h) from the nearest larger pyramid level."""
+    lvl = next((l for l in reversed(pyramid) if l.width >= w and l.height >= h), pyramid[0])
+    return lvl if lvl.size == (w, h) else lvl.resize((w, h), Image.LANCZOS)
+
 def save_square(size, filename):
     """Resize to square, compositing on dark background for opaque output."""
-    img = src.copy()
-    # Crop to actual content (removes transparent borders from landscape source)
-    bb = img.getbbox()
-    if bb:
-        img = img.crop(bb)
-    img.thumbnail((size, size), Image.LANCZOS)
+    scale = min(size / content.width, size / content.height, 1.0)
+    img = scaled_content(max(1, round(content.width * scale)), max(1, round(content.height * scale)))
     canvas = Image.new("RGBA", (size, size), (0, 0, 0, 0))
     x = (size - img.width) // 2
     y = (size - img.height) // 2
     canvas.paste(img, (x, y), img)
     # Flatten onto dark background for PNG without transparency (required by some platforms)
-    bg = Image.new("RGB", (size, size), (7, 9, 10))  # --bg color
+    bg = Image.new("RGB", (size, size), BG_RGB)
     bg.paste(canvas, mask=canvas.split()[3])
-    out = os.path.join(os.path.dirname(__file__), filename)
+    out = os.path.join(HERE, filename)
     bg.save(out, "PNG", optimize=True)
-    print(f"  → {filename}  ({size}×{size})")
+    return f"  → {filename}  ({size}×{size})"
 
 def save_social(filename="social.png"):
     """
@@ -112,15 +145,16 @@ def save_social(filename="social.png"):
     Dark background matching app theme.
     """
     W, H = 1280, 640
-    card = Image.new("RGB", (W, H), (7, 9, 10))
+    card = Image.new("RGB", (W, H), BG_RGB)
 
-    # Logo on left (centered vertically, 480px tall max)
+    # Logo on left (centered vertically, 480px tall max). Framed like the
+    # full (uncropped) source, but drawn from the shared cropped pyramid.
     logo_size = 480
-    logo = src.copy()
-    logo.thumbnail((logo_size, logo_size), Image.LANCZOS)
+    scale = min(logo_size / src.width, logo_size / src.height, 1.0)
+    logo = scaled_content(max(1, round(content.width * scale)), max(1, round(content.height * scale)))
     lx = 100
-    ly = (H - logo.height) // 2
-    card.paste(logo, (lx, ly), logo)
+    ly = (H - round(src.height * scale)) // 2
+    card.paste(logo, (lx + round(bbox[0] * scale), ly + round(bbox[1] * scale)), logo)
 
     # Right-side text via ImageDraw (no font dependency – use default)
     try:
@@ -148,18 +182,25 @@ def save_social(filename="social.png"):
         draw.text((tx, ty_title),      "CrowTalk",                 fill=(232,237,240))
         draw.text((tx, ty_title + 40), "Study · Record · Communicate", fill=(143,160,172))
 
-    out = os.path.join(os.path.dirname(__file__), filename)
+    out = os.path.join(HERE, filename)
     card.save(out, "PNG", optimize=True)
-    print(f"  → {filename}  (1280×640)  ← upload to GitHub → Settings → Social Preview")
-
-# --- Generate all sizes ---
-print("\nGenerating icons...")
-save_square(32,  "icon-32.png")
-save_square(180, "icon-180.png")
-save_square(192, "icon-192.png")
-save_square(512, "icon-512.png")
-save_social("social.png")
-
+    return f"  → {filename}  (1280×640)  ← upload to GitHub → Settings → Social Preview"
+
+def run_job(job):
+    filename, kind, size = job
+    return save_square(size, filename) if kind == "square" else save_social(filename)
+
+# --- Generate stale outputs in parallel (Pillow releases the GIL for resize / PNG encode) ---
+print(f"\nGenerating icons... ({len(stale)} of {len(JOBS)} out of date)")
+with ThreadPoolExecutor(max_workers=len(stale)) as pool:
+    for line in pool.map(run_job, stale):
+        print(line)
+
+for job in stale:
+    stamps[job[0]] = job_key(job)
+os.makedirs(os.path.dirname(STAMPS), exist_ok=True)
+with open(STAMPS, "w", encoding="utf-8") as f:
+    json.dump(stamps, f, indent=1)
 print("""
 Done! Next steps:
   1. python3 build_crowtalk.py        ← rebuilds app with embedded icons
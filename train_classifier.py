@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Train the on-device call classifier from labelled recordings.
+
+Requirements:
+    pip install numpy scipy matplotlib Pillow soundfile   (same as build_crowtalk.py)
+
+Usage:
+    python3 train_classifier.py                        # bundles in bidrag/ + labelled files in ljud/
+    python3 train_classifier.py export1.json more.zip  # extra app exports (crowtalk_data.json / .zip)
+    python3 train_classifier.py --labels ct_labels.json --folds 5 --hidden 32 --jobs 4
+
+Labels:
+    fieldRecordings[].category   in each export  → the recording's own audio
+    libraryLabels / ct_labels    {XC id: {category}} → the matching file in ljud/
+
+Features come from the build's own decode / STFT code (classifier_input) and
+are cached per file in .cache/cls/. Cross-validation folds and feature
+extraction run on all cores. Writes classifier.json (int8 weights, version
+bumped on every run); then rebuild the app:
+    python3 build_crowtalk.py
+"""
+
+import sys, os, json, hashlib, argparse, base64, zipfile
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+sys.stdout.reconfigure(encoding='utf-8')
+import numpy as np
+
+from build_crowtalk import (AUDIO_DIR, CONTRIB_DIR, CACHE_DIR, CLASSIFIER_FILE, CATEGORY_IDS,
+                            CLS_DIM, CLS_FORMAT, CLS_PARAMS, SEG_OFF_DB, SEG_FLUX_K, SEG_MIN_CALL, SEG_MIN_GAP,
+                            SEG_MIN_ICI, TRIM_FRAME, TRIM_PAD, FFMPEG, decode_audio, to_analysis_rate,
+                            stft_power, classifier_input, listdir_sorted, _read_bundle)
+
+FEAT_CACHE  = os.path.join(CACHE_DIR, 'cls')
+_FEAT_VERSION = 1       # bump when classifier_input() in build_crowtalk.py changes – invalidates the cache
+_FEAT_KEY   = repr((_FEAT_VERSION, CLS_FORMAT, sorted(CLS_PARAMS.items()), SEG_OFF_DB, SEG_FLUX_K, SEG_MIN_CALL,
+                    SEG_MIN_GAP, SEG_MIN_ICI, TRIM_FRAME, TRIM_PAD, FFMPEG is not None)).encode()
+MIN_PER_CLASS = 3       # classes with fewer examples are left out of the model
+EPOCHS      = 400
+LR          = 0.01
+L2          = 1e-3
+SEED        = 0
+
+# --- Collect labelled audio ---------------------------------------------------
+
+def collect(bundle_paths, label_files):
+    """Return [(name, raw bytes, category)] from export bundles, label dumps and ljud/."""
+    samples, seen, library = [], set(), {}
+
+    def add(name, raw, cat):
+        if not raw or cat not in CATEGORY_IDS:
+            return
+        h = hashlib.sha1(raw).hexdigest()
+        if h not in seen:
+            seen.add(h)
+            samples.append((name, raw, cat))
+
+    for path in bundle_paths:
+        try:
+            with _read_bundle(path) as (data, load):
+                for rec in data.get('fieldRecordings', []):
+                    try:
+                        add(f"{os.path.basename(path)}#{rec.get('id')}", load(rec), rec.get('category') or '')
+                    except (ValueError, KeyError, TypeError, zipfile.BadZipFile):
+                        continue
+                library.update(data.get('libraryLabels') or {})
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            print(f"  ⚠ skip bundle {os.path.basename(path)} ({e})")
+    for path in label_files:
+        with open(path, encoding='utf-8') as f:
+            library.update(json.load(f))
+
+    if os.path.isdir(AUDIO_DIR):
+        for fname in listdir_sorted(AUDIO_DIR):
+            cat = (library.get(fname.split(' ')[0]) or {}).get('category') or ''
+            if cat and (fname.endswith('.wav') or fname.endswith('.mp3')):
+                with open(os.path.join(AUDIO_DIR, fname), 'rb') as f:
+                    add(fname, f.read(), cat)
+    return samples
+
+# --- Features (cached per file) -----------------------------------------------
+
+def file_features(raw):
+    """classifier_input() of the untrimmed recording (the app classifies the raw take too), or None."""
+    key = hashlib.sha1(raw + _FEAT_KEY).hexdigest()
+    path = os.path.join(FEAT_CACHE, key + '.npy')
+    if os.path.exists(path):
+        return np.load(path)
+    dec = decode_audio(raw)
+    if dec is None:
+        return None
+    vec = classifier_input(*stft_power(to_analysis_rate(dec['data'], dec['sr'])))
+    os.makedirs(FEAT_CACHE, exist_ok=True)
+    np.save(path, vec)
+    return vec
+
+# --- Model: standardise → dense(ReLU) → dense → softmax --------------------------
+
+def train_mlp(X, y, n_classes, hidden, seed=SEED):
+    """Full-batch Adam on class-weighted cross-entropy. Returns (mu, sd, [(W1, b1), (W2, b2)])."""
+    rng = np.random.default_rng(seed)
+    mu, sd = X.mean(axis=0), X.std(axis=0) + 1e-6
+    Z = (X - mu) / sd
+    params = [rng.normal(0, np.sqrt(2 / CLS_DIM), (hidden, CLS_DIM)), np.zeros(hidden),
+              rng.normal(0, np.sqrt(1 / hidden), (n_classes, hidden)), np.zeros(n_classes)]
+    m = [np.zeros_like(p) for p in params]
+    v = [np.zeros_like(p) for p in params]
+    counts = np.bincount(y, minlength=n_classes)
+    w = (len(y) / (n_classes * np.maximum(counts, 1)))[y]
+    Y = np.eye(n_classes)[y]
+    for t in range(1, EPOCHS + 1):
+        W1, b1, W2, b2 = params
+        h = np.maximum(0, Z @ W1.T + b1)
+        o = h @ W2.T + b2
+        p = np.exp(o - o.max(axis=1, keepdims=True))
+        p /= p.sum(axis=1, keepdims=True)
+        d_o = (p - Y) * w[:, None] / w.sum()
+        d_h = (d_o @ W2) * (h > 0)
+        grads = [d_h.T @ Z + L2 * W1, d_h.sum(axis=0), d_o.T @ h + L2 * W2, d_o.sum(axis=0)]
+        for i, g in enumerate(grads):
+            m[i] = 0.9 * m[i] + 0.1 * g
+            v[i] = 0.999 * v[i] + 0.001 * g * g
+            params[i] -= LR * (m[i] / (1 - 0.9 ** t)) / (np.sqrt(v[i] / (1 - 0.999 ** t)) + 1e-8)
+    return mu, sd, [(params[0], params[1]), (params[2], params[3])]
+
+def quantise(layers):
+    """Symmetric per-layer int8 weights: [(int8 W, scale, b)]."""
+    out = []
+    for W, b in layers:
+        scale = float(np.abs(W).max()) / 127 or 1.0
+        out.append((np.round(W / scale).astype(np.int8), scale, b))
+    return out
+
+def predict(mu, sd, qlayers, X):
+    """Forward pass with the int8 weights exactly as the page's worker runs it."""
+    h = (X - mu) / sd
+    for i, (q, scale, b) in enumerate(qlayers):
+        h = (h @ q.T.astype(np.float64)) * scale + b
+        if i < len(qlayers) - 1:
+            h = np.maximum(0, h)
+    return h.argmax(axis=1)
+
+def run_fold(args):
+    X, y, train, test, n_classes, hidden = args
+    mu, sd, layers = train_mlp(X[train], y[train], n_classes, hidden)
+    return test, predict(mu, sd, quantise(layers), X[test])
+
+def stratified_folds(y, k, seed=SEED):
+    """Fold index per sample, each class spread round-robin over the k folds."""
+    rng = np.random.default_rng(seed)
+    fold = np.zeros(len(y), int)
+    for c in np.unique(y):
+        idx = rng.permutation(np.flatnonzero(y == c))
+        fold[idx] = np.arange(len(idx)) % k
+    return fold
+
+# --- Main ----------------------------------------------------------------------
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    ap.add_argument('bundles', nargs='*', help='extra app exports (.json / .zip); bidrag/ is always read')
+    ap.add_argument('--labels', action='append', default=[], help='ct_labels JSON dump {XC id: {category}}')
+    ap.add_argument('--folds', type=int, default=5)
+    ap.add_argument('--hidden', type=int, default=32)
+    ap.add_argument('--jobs', type=int, default=os.cpu_count())
+    ap.add_argument('--out', default=CLASSIFIER_FILE)
+    opt = ap.parse_args()
+
+    bundles = [os.path.join(CONTRIB_DIR, n) for n in listdir_sorted(CONTRIB_DIR)
+               if n.endswith('.json') or n.endswith('.zip')] if os.path.isdir(CONTRIB_DIR) else []
+    print("🔊 Samlar märkta inspelningar...")
+    samples = collect(bundles + opt.bundles, opt.labels)
+
+    with ProcessPoolExecutor(max_workers=opt.jobs) as pool:
+        vecs = list(pool.map(file_features, [raw for _, raw, _ in samples], chunksize=4))
+    rows = [(name, cat, v) for (name, _, cat), v in zip(samples, vecs) if v is not None]
+    for (name, _, _), v in zip(samples, vecs):
+        if v is None:
+            print(f"  ↩ skip  {name}  (cannot decode – webm/mp4 need a WAV/MP3 copy)")
+
+    counts = {c: sum(r[1] == c for r in rows) for c in CATEGORY_IDS}
+    classes = [c for c in CATEGORY_IDS if counts[c] >= MIN_PER_CLASS]
+    for c in CATEGORY_IDS:
+        if counts[c]:
+            print(f"  {'✓' if c in classes else '↩'} {c:<12} {counts[c]}")
+    rows = [r for r in rows if r[1] in classes]
+    if len(classes) < 2:
+        print(f"❌ Need at least two categories with ≥ {MIN_PER_CLASS} decodable recordings each.")
+        sys.exit(1)
+
+    X = np.array([r[2] for r in rows], np.float64)
+    y = np.array([classes.index(r[1]) for r in rows])
+    k = max(2, min(opt.folds, min(counts[c] for c in classes)))
+    fold = stratified_folds(y, k)
+
+    # Cross-validation (int8 model, as shipped), one process per fold
+    pred = np.zeros(len(y), int)
+    jobs = [(X, y, np.flatnonzero(fold != i), np.flatnonzero(fold == i), len(classes), opt.hidden) for i in range(k)]
+    with ProcessPoolExecutor(max_workers=min(opt.jobs, k)) as pool:
+        for test, p in pool.map(run_fold, jobs):
+            pred[test] = p
+    acc = float((pred == y).mean())
+    recall = {c: round(float((pred[y == i] == i).mean()), 3) for i, c in enumerate(classes)}
+    confusion = np.zeros((len(classes), len(classes)), int)
+    np.add.at(confusion, (y, pred), 1)
+    print(f"\n  {k}-fold CV accuracy {acc:.1%}  (n={len(y)})")
+    print('  ' + ' '.join(f"{c[:6]:>6}" for c in classes))
+    for i, c in enumerate(classes):
+        print('  ' + ' '.join(f"{n:>6}" for n in confusion[i]) + f"  ← {c}  recall {recall[c]:.0%}")
+
+    # Final model on all data
+    mu, sd, layers = train_mlp(X, y, len(classes), opt.hidden)
+    try:
+        with open(opt.out, encoding='utf-8') as f:
+            version = int(json.load(f).get('version', 0)) + 1
+    except (OSError, ValueError, TypeError):
+        version = 1
+    model = {
+        'format': CLS_FORMAT, 'version': version,
+        'created': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'params': CLS_PARAMS, 'classes': classes,
+        'mu': np.round(mu, 5).tolist(), 'sd': np.round(sd, 5).tolist(),
+        'layers': [{'shape': list(q.shape), 'scale': scale, 'b': np.round(b, 5).tolist(),
+                    'w': base64.b64encode(q.tobytes()).decode()}
+                   for q, scale, b in quantise(layers)],
+        'cv': {'folds': k, 'n': len(y), 'accuracy': round(acc, 3), 'recall': recall,
+               'confusion': confusion.tolist()},
+    }
+    with open(opt.out, 'w', encoding='utf-8') as f:
+        json.dump(model, f, separators=(',', ':'))
+    print(f"\n✅ {os.path.basename(opt.out)} v{version}  ({os.path.getsize(opt.out)//1024} KB) – kör python3 build_crowtalk.py")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Fill recordist, licence and the other xeno-canto metadata into ljud/index.csv.
+
+Usage:
+    XC_API_KEY=... python3 xc_metadata.py         # every XC id in index.csv or ljud/ that lacks recordist/licence
+    python3 xc_metadata.py XC736923 --key KEY --force
+
+Each recording is looked up in the xeno-canto API v3 (the key is on your
+xeno-canto account page). Empty columns are filled: recordist, licence (as
+"CC BY-NC-SA 4.0"), date, type, quality, locality and lat/lon; values already
+in the index are kept unless --force. Rows are added for XC files in ljud/
+that have none. Then rebuild the app:
+    python3 build_crowtalk.py
+"""
+
+import sys, os, re, csv, json, argparse, urllib.parse, urllib.request
+sys.stdout.reconfigure(encoding='utf-8')
+
+from build_crowtalk import AUDIO_DIR, META_INDEX, META_FIELDS, listdir_sorted
+
+API_URL = 'https://xeno-canto.org/api/3/recordings'
+
+def licence_name(url):
+    """'//creativecommons.org/licenses/by-nc-sa/4.0/' → 'CC BY-NC-SA 4.0' (unknown forms are kept as given)."""
+    if 'publicdomain/zero' in (url or ''):
+        return 'CC0 1.0'
+    m = re.search(r'licenses/([a-z-]+)/([\d.]+)', url or '')
+    return f"CC {m[1].upper()} {m[2]}" if m else (url or '')
+
+def fetch(xc_id, key):
+    """The index.csv fields for one recording from the XC API, or None if XC doesn't know the id."""
+    query = urllib.parse.urlencode({'query': f"nr:{xc_id[2:]}", 'key': key})
+    with urllib.request.urlopen(f"{API_URL}?{query}", timeout=30) as resp:
+        recs = json.load(resp).get('recordings') or []
+    if not recs:
+        return None
+    r = recs[0]
+    return {'recordist': r.get('rec'), 'licence': licence_name(r.get('lic')), 'date': r.get('date'),
+            'type': r.get('type'), 'quality': r.get('q'), 'locality': r.get('loc'),
+            'lat': r.get('lat'), 'lon': r.get('lon', r.get('lng'))}
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    ap.add_argument('ids', nargs='*', help='XC ids to look up (default: all without recordist or licence)')
+    ap.add_argument('--key', default=os.environ.get('XC_API_KEY'), help='xeno-canto API key (or XC_API_KEY)')
+    ap.add_argument('--force', action='store_true', help='overwrite values already in the index')
+    opt = ap.parse_args()
+    if not opt.key:
+        ap.error('an API key is required: --key or XC_API_KEY')
+
+    path = os.path.join(AUDIO_DIR, META_INDEX)
+    rows = {}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8', newline='') as f:
+            rows = {d['id']: d for d in csv.DictReader(f) if d.get('id')}
+    for name in listdir_sorted(AUDIO_DIR):
+        xc_id = name.split(' ')[0]
+        if re.fullmatch(r'XC\d+', xc_id) and (name.endswith('.wav') or name.endswith('.mp3')):
+            rows.setdefault(xc_id, {'id': xc_id})
+    ids = opt.ids or [i for i, d in rows.items() if opt.force or not (d.get('recordist') and d.get('licence'))]
+
+    print(f"🔎 Hämtar metadata för {len(ids)} inspelningar från xeno-canto...")
+    done = 0
+    for xc_id in ids:
+        try:
+            meta = fetch(xc_id, opt.key)
+        except (OSError, ValueError) as e:
+            print(f"  ⚠ {xc_id}  ({e})")
+            continue
+        if meta is None:
+            print(f"  ⚠ {xc_id}  finns inte på xeno-canto")
+            continue
+        row = rows.setdefault(xc_id, {'id': xc_id})
+        for k, v in meta.items():
+            if v not in (None, '') and (opt.force or not row.get(k)):
+                row[k] = str(v)
+        done += 1
+        print(f"  ✓ {xc_id}  © {row.get('recordist', '?')}  {row.get('licence', '?')}")
+
+    if done:
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            w = csv.DictWriter(f, fieldnames=META_FIELDS, extrasaction='ignore', lineterminator='\n')
+            w.writeheader()
+            w.writerows(rows.values())
+    print(f"✅ {META_INDEX}: {done}/{len(ids)} uppdaterade – kör python3 build_crowtalk.py")
+
+if __name__ == '__main__':
+    main()